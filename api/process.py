@@ -7,12 +7,19 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
 from backend.comment_processor import CommentProcessor
 from backend.language_detector import LanguageDetector
+from backend.cache import ResultCache
 
 app = Flask(__name__)
 
 
-comment_processor = CommentProcessor()
+MAX_BLANK_LINES = int(os.environ['UNCOMMENT_MAX_BLANK_LINES']) if os.environ.get('UNCOMMENT_MAX_BLANK_LINES') else None
+DROP_DOCSTRINGS = bool(int(os.environ.get('UNCOMMENT_DROP_DOCSTRINGS', 0)))
+comment_processor = CommentProcessor(MAX_BLANK_LINES, DROP_DOCSTRINGS)
 language_detector = LanguageDetector()
+result_cache = ResultCache(
+    max_bytes=int(os.environ.get('UNCOMMENT_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    ttl=float(os.environ.get('UNCOMMENT_CACHE_TTL', 600))
+)
 
 def handler(request):
     """Vercel serverless function handler"""
@@ -27,10 +34,14 @@ def handler(request):
             
 
             if not language:
-                language = language_detector.detect(code)
+                language = result_cache.memoize(('detect', code), lambda: language_detector.detect(code), len)
             
 
-            result = comment_processor.remove_comments(code, language)
+            result = result_cache.memoize(
+                ('process', code, language.lower()),
+                lambda: comment_processor.remove_comments(code, language),
+                lambda result: len(result['code'])
+            )
             
             return jsonify({
                 'success': True,
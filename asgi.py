@@ -0,0 +1,185 @@
+"""ASGI entry point for /api/process and /api/languages: uvicorn asgi:app (or any ASGI server)"""
+import json
+import os
+import sys
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from backend.cache import ResultCache
+from backend.comment_processor import CommentProcessor
+from backend.compress import COMPRESS_MIN, Decoder, DecodedTooLarge, DecodeError, UnsupportedEncoding, compress, negotiate
+from backend.dispatch import INLINE_LIMIT, Dispatcher, Overloaded
+from backend.language_detector import LanguageDetector
+from backend.metrics import METRICS
+
+
+MAX_BLANK_LINES = int(os.environ['UNCOMMENT_MAX_BLANK_LINES']) if os.environ.get('UNCOMMENT_MAX_BLANK_LINES') else None
+DROP_DOCSTRINGS = bool(int(os.environ.get('UNCOMMENT_DROP_DOCSTRINGS', 0)))
+comment_processor = CommentProcessor(MAX_BLANK_LINES, DROP_DOCSTRINGS)
+language_detector = LanguageDetector()
+result_cache = ResultCache(
+    max_bytes=int(os.environ.get('UNCOMMENT_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    ttl=float(os.environ.get('UNCOMMENT_CACHE_TTL', 600))
+)
+MAX_BODY_BYTES = int(os.environ.get('UNCOMMENT_MAX_BODY_BYTES', 10 * 1024 * 1024))
+CPU_BUDGET = float(os.environ.get('UNCOMMENT_CPU_BUDGET', 2.0)) or None
+METRICS.enabled = bool(int(os.environ.get('UNCOMMENT_METRICS', 0)))
+dispatcher = Dispatcher(
+    int(os.environ.get('UNCOMMENT_OFFLOAD_WORKERS', 0)) or None,
+    inline_limit=int(os.environ.get('UNCOMMENT_INLINE_LIMIT', INLINE_LIMIT)),
+    max_pending=int(os.environ.get('UNCOMMENT_MAX_PENDING', 0)) or None,
+    budget=CPU_BUDGET,
+    max_blank_lines=MAX_BLANK_LINES,
+    drop_docstrings=DROP_DOCSTRINGS
+)
+CORS_HEADERS = [
+    (b'access-control-allow-origin', b'*'),
+    (b'access-control-allow-methods', b'GET, POST, OPTIONS'),
+    (b'access-control-allow-headers', b'Content-Type, Content-Encoding')
+]
+
+class BodyTooLarge(Exception):
+    pass
+
+def header(scope, name: bytes) -> str:
+    for key, value in scope.get('headers', []):
+        if key == name:
+            return value.decode('latin-1')
+    return ''
+
+async def read_body(scope, receive) -> bytes:
+    """The request body, refusing anything over MAX_BODY_BYTES before it is all buffered
+
+    A body sent with a Content-Encoding is decoded as it arrives, and the
+    limit applies to it both as sent and as decoded.
+    """
+    length = header(scope, b'content-length')
+    if length.isdigit() and int(length) > MAX_BODY_BYTES:
+        raise BodyTooLarge()
+    decoder = Decoder(header(scope, b'content-encoding'), MAX_BODY_BYTES)
+    body = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise BodyTooLarge()
+        body.extend(decoder.feed(chunk))
+        if not message.get('more_body'):
+            break
+    body.extend(decoder.end())
+    return b''.join(body)
+
+async def send_json(send, status: int, payload, headers=(), encoding=None):
+    """payload as JSON, compressed in encoding when given and the body is big enough to gain from it"""
+    body = json.dumps(payload).encode('utf-8')
+    if encoding and len(body) >= COMPRESS_MIN:
+        body = compress(body, encoding)
+        headers = [*headers, (b'content-encoding', encoding.encode('ascii'))]
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii')),
+            *CORS_HEADERS,
+            *headers
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+async def process_code(scope, receive, send):
+    try:
+        data = json.loads(await read_body(scope, receive) or b'null')
+    except (BodyTooLarge, DecodedTooLarge):
+        return await send_json(send, 413, {'error': f'Request body exceeds {MAX_BODY_BYTES} bytes'})
+    except UnsupportedEncoding as e:
+        return await send_json(send, 415, {'error': str(e)})
+    except DecodeError as e:
+        return await send_json(send, 400, {'error': str(e)})
+    except ValueError:
+        return await send_json(send, 400, {'error': 'Invalid JSON'})
+    code = data.get('code', '') if isinstance(data, dict) else ''
+    language = data.get('language', '') if isinstance(data, dict) else ''
+
+    if not code or not isinstance(code, str):
+        return await send_json(send, 400, {'error': 'No code provided'})
+
+    if not language:
+        language = result_cache.memoize(('detect', code), lambda: language_detector.detect(code), len)
+
+    key = result_cache.key('process', code, language.lower())
+    result = result_cache.get(key)
+    if result is None:
+        try:
+            item = await dispatcher.run({'code': code, 'language': language})
+        except Overloaded:
+            return await send_json(send, 503, {'error': 'Server busy, retry shortly'}, [(b'retry-after', b'1')])
+        if not item['success']:
+            return await send_json(send, item.get('status', 500), {'error': item['error']})
+        result = {'code': item['processed_code'], 'stats': item['stats']}
+        result_cache.put(key, result, len(result['code']))
+
+    await send_json(send, 200, {
+        'success': True,
+        'processed_code': result['code'],
+        'detected_language': language,
+        'stats': result['stats']
+    }, [(b'vary', b'Accept-Encoding')], negotiate(header(scope, b'accept-encoding')))
+
+async def get_supported_languages(scope, receive, send):
+    await send_json(send, 200, comment_processor.get_supported_languages())
+
+async def get_dispatch_stats(scope, receive, send):
+    await send_json(send, 200, dispatcher.stats())
+
+async def get_metrics(scope, receive, send):
+    if not METRICS.enabled:
+        return await send_json(send, 404, {'error': 'Metrics are disabled; set UNCOMMENT_METRICS=1'})
+    body = METRICS.render().encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', b'text/plain; version=0.0.4; charset=utf-8'), (b'content-length', str(len(body)).encode('ascii'))]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+ROUTES = {
+    '/api/process': ('POST', process_code),
+    '/api/languages': ('GET', get_supported_languages),
+    '/api/dispatch': ('GET', get_dispatch_stats),
+    '/metrics': ('GET', get_metrics)
+}
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            dispatcher.shutdown()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+    route = ROUTES.get(scope['path'].rstrip('/') or '/')
+    if route is None:
+        return await send_json(send, 404, {'error': 'Not found'})
+    method, handler = route
+    if scope['method'] == 'OPTIONS':
+        await send({'type': 'http.response.start', 'status': 204, 'headers': CORS_HEADERS})
+        return await send({'type': 'http.response.body', 'body': b''})
+    if scope['method'] != method:
+        return await send_json(send, 405, {'error': 'Method not allowed'}, [(b'allow', method.encode('ascii'))])
+    try:
+        await handler(scope, receive, send)
+    except Exception as e:
+        await send_json(send, 500, {'error': str(e)})
\ No newline at end of file
@@ -0,0 +1,44 @@
+from typing import Any, Dict, Optional, Tuple
+from .budget import BudgetExceeded, cpu_budget
+from .comment_processor import CommentProcessor, language_for_path
+from .language_detector import LanguageDetector
+_comment_processors: Dict[Tuple[Optional[int], bool], CommentProcessor] = {}
+_language_detector = None
+def _worker_state(max_blank_lines: Optional[int] = None, drop_docstrings: bool = False) -> Tuple[CommentProcessor, LanguageDetector]:
+    global _language_detector
+    comment_processor = _comment_processors.get((max_blank_lines, drop_docstrings))
+    if comment_processor is None:
+        comment_processor = _comment_processors[(max_blank_lines, drop_docstrings)] = CommentProcessor(max_blank_lines, drop_docstrings)
+    if _language_detector is None:
+        _language_detector = LanguageDetector()
+    return comment_processor, _language_detector
+def process_item(item: Any, budget: Optional[float] = None, max_blank_lines: Optional[int] = None, drop_docstrings: bool = False) -> Dict[str, Any]:
+    """Clean one batch item within budget seconds of CPU time; runs inside a worker process
+
+    Without a language, the item's path extension decides it, as in the
+    CLI, and only a path with no known extension falls back to detection.
+    """
+    if not isinstance(item, dict):
+        return {'path': '', 'success': False, 'error': 'Item must be an object'}
+    path = item.get('path', '')
+    code = item.get('code', '')
+    language = item.get('language', '')
+    if not code or not isinstance(code, str):
+        return {'path': path, 'success': False, 'error': 'No code provided'}
+    try:
+        comment_processor, language_detector = _worker_state(max_blank_lines, drop_docstrings)
+        if not language:
+            language = (isinstance(path, str) and language_for_path(path)) or language_detector.detect(code)
+        with cpu_budget(budget):
+            result = comment_processor.remove_comments(code, language)
+    except BudgetExceeded as e:
+        return {'path': path, 'success': False, 'error': str(e), 'status': 422}
+    except Exception as e:
+        return {'path': path, 'success': False, 'error': str(e)}
+    return {
+        'path': path,
+        'success': True,
+        'processed_code': result['code'],
+        'detected_language': language,
+        'stats': result['stats']
+    }
\ No newline at end of file
@@ -0,0 +1,40 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+CHECK_INTERVAL = 1024
+T = TypeVar('T')
+class BudgetExceeded(Exception):
+    """The current request used up its CPU-time budget"""
+class Budget:
+    """CPU-time allowance for one request, measured on the thread doing the work"""
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.thread_time):
+        self.seconds = seconds
+        self.clock = clock
+        self.deadline = clock() + seconds
+    def check(self):
+        if self.clock() > self.deadline:
+            raise BudgetExceeded(f'Processing exceeded the CPU budget of {self.seconds:g}s')
+_current: ContextVar[Optional[Budget]] = ContextVar('budget', default=None)
+@contextmanager
+def cpu_budget(seconds: Optional[float]):
+    """Enforce a budget of seconds of CPU time on parser work inside the block; None or 0 disables it"""
+    token = _current.set(Budget(seconds) if seconds else None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+def check():
+    """Raise BudgetExceeded when the active budget is spent; parser loops call this every CHECK_INTERVAL steps"""
+    budget = _current.get()
+    if budget is not None:
+        budget.check()
+def checked(items: Iterable[T]) -> Iterator[T]:
+    """items, checking the active budget every CHECK_INTERVAL of them"""
+    if _current.get() is None:
+        yield from items
+        return
+    for i, item in enumerate(items):
+        if not i % CHECK_INTERVAL:
+            check()
+        yield item
\ No newline at end of file
@@ -0,0 +1,91 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+ENTRY_OVERHEAD = 256
+class ResultCache:
+    """LRU cache of processing results keyed by a content hash, bounded by size and age
+
+    Each entry counts as its value's size plus its key and ENTRY_OVERHEAD
+    bytes for the key object, the entry tuple and the dict node holding
+    them, so even entries with tiny values stay within max_bytes.
+    """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 600.0, clock: Callable[[], float] = time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.entries: 'OrderedDict[str, Tuple[Any, int, float]]' = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.lock = threading.Lock()
+    @staticmethod
+    def key(*parts: str) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            data = part.encode('utf-8', 'surrogatepass')
+            digest.update(len(data).to_bytes(8, 'little'))
+            digest.update(data)
+        return digest.hexdigest()
+    def get(self, key: str, default: Any = None) -> Any:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, size, expires = entry
+            if expires <= self.clock():
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+    def put(self, key: str, value: Any, size: int):
+        """Store value under key; size is the value's own size, to which put() adds the entry's overhead"""
+        size += len(key) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._drop(key)
+            self.entries[key] = (value, size, self.clock() + self.ttl)
+            self.size += size
+            while self.size > self.max_bytes:
+                oldest = next(iter(self.entries))
+                self._drop(oldest)
+                self.evictions += 1
+    def _drop(self, key: str):
+        _, size, _ = self.entries.pop(key)
+        self.size -= size
+    def memoize(self, parts: Tuple[str, ...], compute: Callable[[], Any], size_of: Callable[[Any], int]) -> Any:
+        """Return the cached result for parts, computing and storing it on a miss"""
+        key = self.key(*parts)
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value, size_of(value))
+        return value
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
@@ -0,0 +1,165 @@
+"""Command-line bulk comment removal: python -m backend SRC... (--in-place | -o DIR)"""
+import argparse
+import hashlib
+import mmap
+import os
+import shutil
+import sys
+import time
+from contextlib import suppress
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from .batch import _worker_state
+from .comment_processor import EXTENSIONS, CommentProcessor, language_for_path
+from .manifest import Manifest, content_hash
+from .parsers.buffers import Buffer, write_buffers
+Task = Tuple[str, str, Optional[str], bool, Optional[Dict[str, Any]]]
+def iter_files(paths: List[str], skip: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+    """(file, path relative to its root) for every file under paths, skipping hidden directories"""
+    for root in paths:
+        if os.path.isfile(root):
+            yield root, os.path.basename(root)
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(
+                name for name in dirnames
+                if not name.startswith('.') and os.path.abspath(os.path.join(dirpath, name)) != skip
+            )
+            for name in sorted(filenames):
+                path = os.path.join(dirpath, name)
+                yield path, os.path.relpath(path, root)
+def process_file(task: Task) -> Dict[str, Any]:
+    """Clean one file on disk; runs inside a worker process"""
+    source = task[0]
+    result = {'path': source, 'status': 'skipped', 'language': task[2], 'bytes': 0, 'removed': 0}
+    try:
+        with open(source, 'rb') as f:
+            size = result['bytes'] = os.fstat(f.fileno()).st_size
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        try:
+            _clean_file(data, task, result)
+        finally:
+            if size:
+                with suppress(BufferError):
+                    data.close()
+    except (OSError, UnicodeDecodeError) as e:
+        result.update(status='failed', error=str(e))
+    return result
+def _clean_file(data, task: Task, result: Dict[str, Any]):
+    """process_file() on the mapped source: output goes straight from the map to disk with writev"""
+    source, target, language, detect, previous = task
+    if data.find(b'\0') != -1:
+        return
+    comment_processor, language_detector = _worker_state()
+    if not language:
+        if not detect:
+            return
+        language = result['language'] = language_detector.detect(str(data[:language_detector.sample_size], 'utf-8', 'ignore'))
+    if language not in comment_processor.parsers:
+        return
+    parser = comment_processor.parser_version(language)
+    source_hash = content_hash(data)
+    if previous and previous['hash'] == source_hash and Manifest.is_current(previous, target, parser):
+        entry = Manifest.entry(target, os.stat(source), source_hash, language, parser, previous['output'])
+        result.update(status='unchanged', entry=entry)
+        return
+    cleaned = comment_processor.remove_comments_bytes(data, language)
+    digest = hashlib.sha256()
+    for buffer in cleaned['buffers']:
+        digest.update(buffer)
+    output_hash = digest.hexdigest()
+    if target != source:
+        os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+        _write(target, cleaned['buffers'])
+    elif output_hash != source_hash:
+        _write(target, cleaned['buffers'], replace=True)
+        source_hash = output_hash
+    cleaned['buffers'].clear()
+    entry = Manifest.entry(target, os.stat(source), source_hash, language, parser, output_hash)
+    result.update(status='processed', removed=cleaned['stats']['removed'], entry=entry)
+def _write(path: str, buffers: List[Buffer], replace: bool = False):
+    """Write buffers to path; with replace, through a temporary file so a mapped source is never truncated"""
+    temp = f'{path}.{os.getpid()}.tmp' if replace else path
+    fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        write_buffers(fd, buffers)
+    finally:
+        os.close(fd)
+    if replace:
+        shutil.copymode(path, temp)
+        os.replace(temp, path)
+def build_tasks(args: argparse.Namespace, manifest: Optional[Manifest] = None) -> Tuple[List[Task], int]:
+    """Tasks for every file that needs work, plus how many the manifest showed to be unchanged"""
+    output = os.path.abspath(args.output) if args.output else None
+    versions = CommentProcessor().parser_version if manifest else None
+    tasks = []
+    unchanged = 0
+    for path, relative in iter_files(args.paths, skip=output):
+        language = args.language or language_for_path(path)
+        if language is None and args.no_detect:
+            continue
+        target = os.path.join(output, relative) if output else path
+        previous = manifest.get(path) if manifest else None
+        if previous:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                stat = None
+            if stat and (language is None or language == previous['language']) and Manifest.is_fresh(
+                previous, target, stat, versions(previous['language'])
+            ):
+                unchanged += 1
+                continue
+        tasks.append((path, target, language, not args.no_detect, previous))
+    return tasks, unchanged
+def run(tasks: List[Task], jobs: int) -> Iterator[Dict[str, Any]]:
+    if jobs <= 1 or len(tasks) <= 1:
+        yield from map(process_file, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(process_file, tasks, chunksize=max(1, len(tasks) // (jobs * 4)))
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m backend', description='Remove comments from source trees')
+    parser.add_argument('paths', nargs='+', help='files or directories to process')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('-i', '--in-place', action='store_true', help='rewrite files in place')
+    target.add_argument('-o', '--output', help='write cleaned files to this directory, mirroring the input tree')
+    parser.add_argument('-l', '--language', help='force one language instead of choosing by extension')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='worker processes (default: CPU count)')
+    parser.add_argument('--no-detect', action='store_true', help='skip files with unknown extensions instead of detecting their language')
+    parser.add_argument('-m', '--manifest', help='manifest file; files unchanged since the last run with it are skipped')
+    parser.add_argument('-v', '--verbose', action='store_true', help='print one line per file')
+    return parser.parse_args(argv)
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.language and args.language.lower() not in EXTENSIONS.values():
+        print(f'Unsupported language: {args.language}', file=sys.stderr)
+        return 2
+    args.language = args.language and args.language.lower()
+    started = time.perf_counter()
+    manifest = Manifest(args.manifest) if args.manifest else None
+    tasks, unchanged = build_tasks(args, manifest)
+    counts = {'processed': 0, 'unchanged': unchanged, 'skipped': 0, 'failed': 0}
+    total_bytes = 0
+    removed = 0
+    for result in run(tasks, args.jobs):
+        counts[result['status']] += 1
+        if result['status'] == 'processed':
+            total_bytes += result['bytes']
+            removed += result['removed']
+        if manifest and 'entry' in result:
+            manifest.record(result['path'], result['entry'])
+        if result['status'] == 'failed':
+            print(f"{result['path']}: {result['error']}", file=sys.stderr)
+        elif args.verbose:
+            print(f"{result['status']:9} {result['language'] or '-':10} {result['path']}")
+    if manifest:
+        manifest.save()
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(
+        f"{counts['processed']} files processed, {counts['unchanged']} unchanged, "
+        f"{counts['skipped']} skipped, {counts['failed']} failed, "
+        f"{removed} comments removed in {elapsed:.2f}s "
+        f"({counts['processed'] / elapsed:.1f} files/s, {total_bytes / elapsed / 1e6:.2f} MB/s)"
+    )
+    return 1 if counts['failed'] else 0
\ No newline at end of file
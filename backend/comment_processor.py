@@ -1,27 +1,69 @@
+import hashlib
+import os
 import re
-from typing import Dict, List, Tuple, Any
-from .parsers import *
+import threading
+from collections.abc import Mapping
+from concurrent.futures import Executor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any
+from .metrics import INPUT_SIZE, METRICS, PROCESSED, REMOVED, REMOVE_SECONDS
+from .parsers import EXTENSIONS, PARSERS, BaseParser, parser_class
+from .parsers.base_parser import PIECE_LOOKAHEAD, split_pieces
+PARALLEL_MIN_PIECE = 256 * 1024
+PARSERS_DIR = os.path.join(os.path.dirname(__file__), 'parsers')
+_parsers_digest: Optional[bytes] = None
+def _parsers_source() -> bytes:
+    """Digest of the source of every module under backend/parsers, read once per process"""
+    global _parsers_digest
+    if _parsers_digest is None:
+        digest = hashlib.sha256()
+        for name in sorted(os.listdir(PARSERS_DIR)):
+            if name.endswith('.py'):
+                with open(os.path.join(PARSERS_DIR, name), 'rb') as f:
+                    digest.update(name.encode('utf-8'))
+                    digest.update(f.read())
+        _parsers_digest = digest.digest()
+    return _parsers_digest
+def language_for_path(path: str) -> Optional[str]:
+    """The language registered for path's file extension, or None"""
+    return EXTENSIONS.get(os.path.splitext(path)[1][1:].lower())
+class LazyParsers(Mapping):
+    """language -> parser instance, importing and building each parser on first lookup
+
+    Membership, len() and iteration only consult the registry, so listing
+    the supported languages loads nothing. Every parser is built with
+    max_blank_lines and drop_docstrings.
+    """
+    def __init__(self, max_blank_lines: Optional[int] = None, drop_docstrings: bool = False):
+        self.max_blank_lines = max_blank_lines
+        self.drop_docstrings = drop_docstrings
+        self.loaded: Dict[str, BaseParser] = {}
+        self.lock = threading.Lock()
+    def __getitem__(self, language: str) -> BaseParser:
+        parser = self.loaded.get(language)
+        if parser is None:
+            cls = parser_class(language)
+            with self.lock:
+                parser = self.loaded.setdefault(language, cls(self.max_blank_lines, self.drop_docstrings))
+        return parser
+    def __contains__(self, language) -> bool:
+        return language in PARSERS
+    def __iter__(self) -> Iterator[str]:
+        return iter(PARSERS)
+    def __len__(self) -> int:
+        return len(PARSERS)
 class CommentProcessor:
-    def __init__(self):
-        self.parsers = {
-            'python': PythonParser(),
-            'javascript': JavaScriptParser(),
-            'typescript': TypeScriptParser(),
-            'java': JavaParser(),
-            'cpp': CppParser(),
-            'c': CParser(),
-            'csharp': CSharpParser(),
-            'go': GoParser(),
-            'rust': RustParser(),
-            'php': PhpParser(),
-            'ruby': RubyParser(),
-            'swift': SwiftParser(),
-            'kotlin': KotlinParser(),
-            'scala': ScalaParser(),
-            'html': HtmlParser(),
-            'css': CssParser(),
-            'sql': SqlParser()
-        }
+    """Comment removal for every registered language
+
+    max_blank_lines caps runs of blank lines in the output, trailing
+    whitespace being trimmed too, for every parser, line-based ones
+    included; None keeps each parser's default (2 for scanner-based
+    parsers, untouched whitespace for Python and line-based ones).
+    drop_docstrings also removes docstrings in languages that have them
+    (Python).
+    """
+    def __init__(self, max_blank_lines: Optional[int] = None, drop_docstrings: bool = False):
+        self.parsers = LazyParsers(max_blank_lines, drop_docstrings)
+        self.versions: Dict[str, str] = {}
     def remove_comments(self, code: str, language: str) -> Dict[str, Any]:
         """Advanced comment removal"""
         if not code or not language:
@@ -30,12 +72,93 @@ class CommentProcessor:
         parser = self.parsers.get(language)
         if not parser:
             return {'code': code, 'stats': {'removed': 0}}
-        result = parser.process(code)
+        with METRICS.timer(REMOVE_SECONDS, language):
+            result = parser.process(code)
+        self._record(language, len(code), result['comments_removed'])
         return {
             'code': result['cleaned_code'],
             'stats': {
                 'removed': result['comments_removed']
             }
         }
+    def remove_comments_parallel(self, code: str, language: str, executor: Executor, pieces: int = 8) -> Dict[str, Any]:
+        """remove_comments() on one large input, cleaned as up to pieces ranges on executor's workers
+
+        Cuts fall on line breaks (see split_pieces) at least PARALLEL_MIN_PIECE
+        characters apart. Each piece is cleaned as though nothing were open
+        where it starts and reports whether that still holds where it ends;
+        where it does not, because a comment or string runs over the cut, the
+        piece is redone here together with the following ones until a cut
+        comes out settled. The result is always identical to remove_comments(),
+        which benchmarks/equivalence.py checks at random cuts.
+        Any Executor works, since parsers are stateless and picklable.
+        """
+        language = (language or '').lower()
+        parser = self.parsers.get(language)
+        count = min(pieces, len(code or '') // PARALLEL_MIN_PIECE)
+        if not parser or count < 2:
+            return self.remove_comments(code, language)
+        with METRICS.timer(REMOVE_SECONDS, language):
+            bounds = split_pieces(code, count)
+            futures = [executor.submit(parser.process_piece, code[start:end + PIECE_LOOKAHEAD], end - start, end == len(code)) for start, end in bounds]
+            cleaned = []
+            removed = 0
+            i = 0
+            while i < len(bounds):
+                text, piece_removed, settled = futures[i].result()
+                last = i
+                while not settled:
+                    last = min(2 * last - i + 1, len(bounds) - 1)
+                    start, end = bounds[i][0], bounds[last][1]
+                    text, piece_removed, settled = parser.process_piece(code[start:end + PIECE_LOOKAHEAD], end - start, end == len(code))
+                cleaned.append(text)
+                removed += piece_removed
+                i = last + 1
+            output = parser.join_pieces(cleaned)
+        self._record(language, len(code), removed)
+        return {'code': output, 'stats': {'removed': removed}}
+    def _record(self, language: str, size: int, removed: int):
+        if METRICS.enabled:
+            INPUT_SIZE.observe(size, language)
+            PROCESSED.inc(1, language)
+            REMOVED.inc(removed, language)
+    def remove_comments_bytes(self, data, language: str) -> Dict[str, Any]:
+        """remove_comments() on UTF-8 bytes or an mmap, returning the output as a list of buffers"""
+        parser = self.parsers.get((language or '').lower())
+        if not parser or not len(data):
+            return {'buffers': [data] if len(data) else [], 'stats': {'removed': 0}}
+        buffers, removed = parser.process_bytes(data)
+        return {'buffers': buffers, 'stats': {'removed': removed}}
+    def remove_comments_stream(self, chunks: Iterable[str], language: str, stats: Optional[Dict[str, int]] = None) -> Iterator[str]:
+        """Streaming remove_comments(): yields cleaned chunks, setting stats['removed'] once exhausted"""
+        stats = {} if stats is None else stats
+        stats['removed'] = 0
+        parser = self.parsers.get((language or '').lower())
+        if not parser:
+            yield from chunks
+            return
+        parser_stats = {}
+        yield from parser.process_stream(chunks, parser_stats)
+        stats['removed'] = parser_stats['comments_removed']
+    def parser_version(self, language: str) -> Optional[str]:
+        """Fingerprint of a parser's rules: its patterns, its settings and the source of every parser module
+
+        Every module under backend/parsers counts, not only the ones this
+        parser's classes live in, since helpers such as spans and buffers
+        shape the output of all of them.
+        """
+        language = (language or '').lower()
+        parser = self.parsers.get(language)
+        if not parser:
+            return None
+        version = self.versions.get(language)
+        if version is None:
+            digest = hashlib.sha256()
+            for pattern in (parser.get_string_patterns(), parser.get_comment_patterns(), parser.get_multiline_comment_patterns(), parser.get_token_pattern()):
+                digest.update(repr(pattern).encode('utf-8'))
+            digest.update(repr((parser.max_blank_lines, parser.drop_docstrings)).encode('utf-8'))
+            digest.update(_parsers_source())
+            version = self.versions[language] = digest.hexdigest()[:16]
+        return version
     def get_supported_languages(self) -> List[str]:
         return list(self.parsers.keys())
\ No newline at end of file
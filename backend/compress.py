@@ -0,0 +1,148 @@
+import zlib
+from importlib.util import find_spec
+from typing import Callable, Iterable, Iterator, List, Optional
+ZSTD = find_spec('zstandard') is not None
+READ_SIZE = 64 * 1024
+COMPRESS_MIN = 1024
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+class UnsupportedEncoding(Exception):
+    """The body has a Content-Encoding this server cannot decode; the caller should answer 415"""
+class DecodeError(Exception):
+    """The body is not valid for its Content-Encoding; the caller should answer 400"""
+class DecodedTooLarge(Exception):
+    """The decoded body is over its limit; the caller should answer 413"""
+def encodings() -> List[str]:
+    """Content codings that can be decoded and produced here, best first; zstd needs the zstandard package"""
+    return ['zstd', 'gzip'] if ZSTD else ['gzip']
+def _zstd():
+    """The zstandard module, imported the first time zstd is used: most requests carry no coding at all"""
+    import zstandard
+    return zstandard
+class _Sink:
+    """Writer that zstandard's stream_writer hands each piece of output to"""
+    def __init__(self, take: Callable[[bytes], None]):
+        self.take = take
+    def write(self, data: bytes) -> int:
+        self.take(data)
+        return len(data)
+class Decoder:
+    """A request body sent with Content-Encoding encoding, decoded piece by piece as it arrives
+
+    feed() and end() return the decoded pieces, each at most READ_SIZE
+    bytes, so a small compressed body never expands in memory past limit
+    plus one piece: DecodedTooLarge is raised as soon as the total goes
+    over it. gzip bodies may hold several members and zstd bodies several
+    frames, as concatenating compressed streams gives. identity (or no
+    encoding) passes the body through, under the same limit.
+    """
+    def __init__(self, encoding: Optional[str], limit: Optional[int] = None):
+        self.encoding = (encoding or 'identity').strip().lower()
+        self.limit = limit
+        self.size = 0
+        self.out: List[bytes] = []
+        if self.encoding in ('gzip', 'x-gzip'):
+            self.inflater = zlib.decompressobj(31)
+            self.started = False
+        elif self.encoding == 'zstd' and ZSTD:
+            self.zstd = _zstd()
+            self.writer = self.zstd.ZstdDecompressor().stream_writer(_Sink(self._take), write_size=READ_SIZE)
+        elif self.encoding != 'identity':
+            raise UnsupportedEncoding(f"Unsupported Content-Encoding '{self.encoding}'; use {', '.join(encodings())} or identity")
+    def feed(self, data: bytes) -> List[bytes]:
+        if not data:
+            return []
+        if self.encoding == 'identity':
+            self._take(data)
+        elif self.encoding == 'zstd':
+            try:
+                self.writer.write(data)
+            except self.zstd.ZstdError as e:
+                raise DecodeError(f'Invalid zstd body: {e}') from None
+        else:
+            self._inflate(data)
+        out, self.out = self.out, []
+        return out
+    def end(self) -> List[bytes]:
+        """Whatever is left once the body is complete; a gzip body cut short raises DecodeError"""
+        if self.encoding in ('gzip', 'x-gzip') and self.started:
+            raise DecodeError('Invalid gzip body: it ends before its last member does')
+        out, self.out = self.out, []
+        return out
+    def _inflate(self, data: bytes):
+        """Inflate data into pieces of at most READ_SIZE, starting over at every new gzip member"""
+        try:
+            while True:
+                self.started = self.started or bool(data)
+                piece = self.inflater.decompress(data, READ_SIZE)
+                self._take(piece)
+                if self.inflater.eof:
+                    data = self.inflater.unused_data
+                    self.inflater = zlib.decompressobj(31)
+                    self.started = False
+                    if not data.strip(b'\0'):
+                        return
+                else:
+                    data = self.inflater.unconsumed_tail
+                    if not data and len(piece) < READ_SIZE:
+                        return
+        except zlib.error as e:
+            raise DecodeError(f'Invalid gzip body: {e}') from None
+    def _take(self, data: bytes):
+        if not data:
+            return
+        self.size += len(data)
+        if self.limit is not None and self.size > self.limit:
+            raise DecodedTooLarge(f'Decoded request body exceeds {self.limit} bytes')
+        self.out.append(data)
+def decoded(read: Callable[[int], bytes], encoding: Optional[str], limit: Optional[int] = None) -> Iterator[bytes]:
+    """The body read(READ_SIZE) returns until it returns b'', decoded as it is read; an unsupported encoding raises here, before any of it is"""
+    return _decoded(read, Decoder(encoding, limit))
+def _decoded(read: Callable[[int], bytes], decoder: Decoder) -> Iterator[bytes]:
+    while True:
+        data = read(READ_SIZE)
+        if not data:
+            break
+        yield from decoder.feed(data)
+    yield from decoder.end()
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """The coding to answer in for an Accept-Encoding header, or None for identity
+
+    The client's highest q-value wins; ties go to the order of encodings().
+    A coding with q=0, or covered by *;q=0, is never chosen.
+    """
+    weights = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights['gzip' if name == 'x-gzip' else name] = q
+    offered = [(weights.get(name, weights.get('*', 0.0)), -i, name) for i, name in enumerate(encodings())]
+    q, _, name = max(offered)
+    return name if q > 0 else None
+def compress(data: bytes, encoding: str) -> bytes:
+    """data in one of encodings()"""
+    if encoding == 'zstd':
+        return _zstd().ZstdCompressor(ZSTD_LEVEL).compress(data)
+    deflater = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return deflater.compress(data) + deflater.flush()
+def compressed(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """chunks as one stream in one of encodings(), compressed as they come"""
+    if encoding == 'zstd':
+        compressor = _zstd().ZstdCompressor(ZSTD_LEVEL).compressobj()
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
\ No newline at end of file
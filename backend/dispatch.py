@@ -0,0 +1,34 @@
+import asyncio
+from concurrent.futures import BrokenExecutor
+from typing import Any, Dict
+from .batch import process_item
+from .pool import INLINE_LIMIT, Overloaded, WorkerPool
+class Dispatcher(WorkerPool):
+    """Runs small jobs inline on the event loop and large ones on the worker pool
+
+    Admission, metrics and restarts are WorkerPool's: at most max_pending
+    large jobs may be queued or running at once, past which run() raises
+    Overloaded instead of letting the queue grow.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.inline = 0
+    async def run(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """process_item(item, budget, max_blank_lines, drop_docstrings), inline when its code is at most inline_limit characters"""
+        args = (item, self.budget, self.max_blank_lines, self.drop_docstrings)
+        if not self.offloads(item.get('code') or ''):
+            self.inline += 1
+            return process_item(*args)
+        with self._slot():
+            executor, future = self._submit(process_item, *args)
+            if future is not None:
+                try:
+                    shipped = await asyncio.wrap_future(future)
+                except BrokenExecutor:
+                    self._discard(executor)
+                    raise
+        if future is None:
+            return process_item(*args)
+        return self._unwrap(shipped)
+    def stats(self) -> Dict[str, Any]:
+        return dict(super().stats(), inline=self.inline)
\ No newline at end of file
@@ -1,7 +1,12 @@
 import re
-from typing import Dict, List
+from typing import Dict, List, Tuple
+from .metrics import DETECT_SECONDS, DETECTED, METRICS
+from .parsers.scanner import literal_prefix
+SAMPLE_SIZE = 64 * 1024
+CHECK_INTERVAL = 4096
 class LanguageDetector:
-    def __init__(self):
+    def __init__(self, sample_size: int = SAMPLE_SIZE):
+        self.sample_size = sample_size
         self.patterns = {
             'python': [
                 r'def\s+\w+\s*\(',
@@ -9,8 +14,8 @@ class LanguageDetector:
                 r'from\s+\w+\s+import',
                 r'if\s+__name__\s*==\s*["\']__main__["\']',
                 r'#.*',
-                r'""".*?"""',
-                r"'''.*?'''"
+                r'"""(?s:.*?)"""',
+                r"'''(?s:.*?)'''"
             ],
             'javascript': [
                 r'function\s+\w+\s*\(',
@@ -18,7 +23,7 @@ class LanguageDetector:
                 r'let\s+\w+\s*=',
                 r'const\s+\w+\s*=',
                 r'//.*',
-                r'/\*.*?\*/',
+                r'/\*(?s:.*?)\*/',
                 r'console\.log\s*\(',
                 r'document\.\w+'
             ],
@@ -28,14 +33,14 @@ class LanguageDetector:
                 r':\s*(string|number|boolean)',
                 r'export\s+(interface|type|class)',
                 r'//.*',
-                r'/\*.*?\*/'
+                r'/\*(?s:.*?)\*/'
             ],
             'java': [
                 r'public\s+class\s+\w+',
                 r'public\s+static\s+void\s+main',
                 r'import\s+[\w.]+;',
                 r'//.*',
-                r'/\*.*?\*/',
+                r'/\*(?s:.*?)\*/',
                 r'System\.out\.print'
             ],
             'cpp': [
@@ -44,14 +49,14 @@ class LanguageDetector:
                 r'int\s+main\s*\(',
                 r'std::\w+',
                 r'//.*',
-                r'/\*.*?\*/'
+                r'/\*(?s:.*?)\*/'
             ],
             'c': [
                 r'#include\s*<[\w.]+\.h>',
                 r'int\s+main\s*\(',
                 r'printf\s*\(',
                 r'//.*',
-                r'/\*.*?\*/'
+                r'/\*(?s:.*?)\*/'
             ],
             'csharp': [
                 r'using\s+System',
@@ -59,7 +64,7 @@ class LanguageDetector:
                 r'public\s+class\s+\w+',
                 r'Console\.WriteLine',
                 r'//.*',
-                r'/\*.*?\*/'
+                r'/\*(?s:.*?)\*/'
             ],
             'go': [
                 r'package\s+\w+',
@@ -67,7 +72,7 @@ class LanguageDetector:
                 r'func\s+\w+\s*\(',
                 r'fmt\.Print',
                 r'//.*',
-                r'/\*.*?\*/'
+                r'/\*(?s:.*?)\*/'
             ],
             'rust': [
                 r'fn\s+\w+\s*\(',
@@ -75,7 +80,7 @@ class LanguageDetector:
                 r'use\s+\w+',
                 r'println!\s*\(',
                 r'//.*',
-                r'/\*.*?\*/'
+                r'/\*(?s:.*?)\*/'
             ],
             'php': [
                 r'<\?php',
@@ -83,7 +88,7 @@ class LanguageDetector:
                 r'function\s+\w+\s*\(',
                 r'echo\s+',
                 r'//.*',
-                r'/\*.*?\*/',
+                r'/\*(?s:.*?)\*/',
                 r'#.*'
             ],
             'ruby': [
@@ -100,19 +105,19 @@ class LanguageDetector:
                 r'let\s+\w+\s*=',
                 r'print\s*\(',
                 r'//.*',
-                r'/\*.*?\*/'
+                r'/\*(?s:.*?)\*/'
             ],
             'html': [
                 r'<!DOCTYPE\s+html>',
                 r'<html.*?>',
                 r'<head.*?>',
                 r'<body.*?>',
-                r'<!--.*?-->'
+                r'<!--(?s:.*?)-->'
             ],
             'css': [
                 r'\w+\s*\{',
                 r'[\w-]+\s*:\s*[\w\s#.-]+;',
-                r'/\*.*?\*/'
+                r'/\*(?s:.*?)\*/'
             ],
             'sql': [
                 r'SELECT\s+',
@@ -120,22 +125,107 @@ class LanguageDetector:
                 r'WHERE\s+',
                 r'INSERT\s+INTO',
                 r'--.*',
-                r'/\*.*?\*/'
+                r'/\*(?s:.*?)\*/'
             ]
         }
+        self._compile()
+    def _compile(self):
+        """Build one dispatch table over every language's patterns.
+
+        The input is tokenized once into identifiers and trigger punctuation;
+        each token only runs the signals keyed by it (plus the few signals
+        with no literal start), anchored at the token. Signals ending in a
+        greedy ``.*`` used to run to the end of the input, so they score at
+        most once per detection, as they always have.
+        """
+        languages: Dict[str, List[str]] = {}
+        for language, patterns in self.patterns.items():
+            for pattern in patterns:
+                languages.setdefault(pattern, []).append(language)
+        self.weights = {language: 1 / len(patterns) for language, patterns in self.patterns.items() if patterns}
+        self.signals: List[Tuple[re.Pattern, List[str]]] = [
+            (re.compile(pattern, re.MULTILINE | re.IGNORECASE), langs) for pattern, langs in languages.items()
+        ]
+        self.once = {i for i, pattern in enumerate(languages) if pattern.endswith('.*')}
+        self.dispatch: Dict[str, List[int]] = {}
+        self.unanchored: List[int] = []
+        self.max_rate = {language: 0.0 for language in self.weights}
+        punctuation = set()
+        for i, pattern in enumerate(languages):
+            prefix = literal_prefix(pattern)
+            word = re.match(r'\w*', prefix).group()
+            if word:
+                self.dispatch.setdefault(word.lower(), []).append(i)
+            elif prefix:
+                self.dispatch.setdefault(prefix[0], []).append(i)
+                punctuation.add(prefix[0])
+            else:
+                self.unanchored.append(i)
+            if i not in self.once:
+                for language in self.signals[i][1]:
+                    self.max_rate[language] += self.weights[language] / max(len(prefix), 1)
+        chars = ''.join(re.escape(char) for char in sorted(punctuation))
+        self.scanner = re.compile(f'[^\\W\\d]\\w*|[{chars}]')
+    def _sample(self, code: str) -> str:
+        if len(code) <= self.sample_size:
+            return code
+        cut = code.rfind('\n', 0, self.sample_size)
+        return code[:cut if cut > 0 else self.sample_size]
+    def _scores(self, counts: Dict[str, int]) -> Dict[str, float]:
+        return {language: count / len(self.patterns[language]) for language, count in counts.items()}
+    def _decided(self, counts: Dict[str, int], remaining: int, seen: set) -> bool:
+        """True once no other language can catch the leader in the remaining text"""
+        scores = self._scores(counts)
+        leader = max(scores, key=scores.get)
+        lead = scores[leader]
+        if lead <= 0:
+            return False
+        for language, score in scores.items():
+            if language == leader:
+                continue
+            pending = sum(self.weights[language] for i in self.once - seen if language in self.signals[i][1])
+            if lead <= score + pending + remaining * self.max_rate[language]:
+                return False
+        return True
     def detect(self, code: str) -> str:
         """Advanced language detection using pattern matching"""
+        if not METRICS.enabled:
+            return self._detect(code)
+        with METRICS.timer(DETECT_SECONDS):
+            language = self._detect(code)
+        DETECTED.inc(1, language)
+        return language
+    def _detect(self, code: str) -> str:
         if not code:
             return 'unknown'
-        scores = {}
-        code_lower = code.lower()
-        for language, patterns in self.patterns.items():
-            score = 0
-            for pattern in patterns:
-                matches = len(re.findall(pattern, code, re.MULTILINE | re.DOTALL | re.IGNORECASE))
-                score += matches
-            scores[language] = score / len(patterns) if patterns else 0
+        sample = self._sample(code)
+        counts = {language: 0 for language in self.weights}
+        signals = self.signals
+        once = self.once
+        seen = set()
+        resume = [0] * len(signals)
+        dispatch = self.dispatch
+        unanchored = self.unanchored
+        checkpoint = CHECK_INTERVAL
+        for token in self.scanner.finditer(sample):
+            start = token.start()
+            if start >= checkpoint:
+                if self._decided(counts, len(sample) - start, seen):
+                    break
+                checkpoint = start + CHECK_INTERVAL
+            candidates = dispatch.get(token.group().lower(), [])
+            for i in (candidates + unanchored if unanchored else candidates):
+                if start < resume[i] or (i in once and i in seen):
+                    continue
+                match = signals[i][0].match(sample, start)
+                if not match:
+                    continue
+                resume[i] = max(match.end(), start + 1)
+                seen.add(i)
+                for language in signals[i][1]:
+                    counts[language] += 1
+        scores = self._scores(counts)
         if scores:
             detected = max(scores, key=scores.get)
-            return detected if scores[detected] > 0 else 'unknown' 
-        return 'unknown'
\ No newline at end of file
+            return detected if scores[detected] > 0 else 'unknown'
+        return 'unknown'
@@ -0,0 +1,52 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+MANIFEST_VERSION = 1
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+class Manifest:
+    """On-disk record of processed files: source (size, mtime, hash) and parser version -> output hash"""
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.load()
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get('version') == MANIFEST_VERSION:
+            self.entries = data.get('entries', {})
+    def save(self):
+        """Write the manifest atomically so an interrupted run never leaves it half written"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        temp = f'{self.path}.tmp'
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'entries': self.entries}, f, separators=(',', ':'))
+        os.replace(temp, self.path)
+    def get(self, source: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(os.path.abspath(source))
+    def record(self, source: str, entry: Dict[str, Any]):
+        self.entries[os.path.abspath(source)] = entry
+    @staticmethod
+    def entry(target: str, stat: os.stat_result, source_hash: str, language: str, parser: str, output_hash: str) -> Dict[str, Any]:
+        return {
+            'target': os.path.abspath(target),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'hash': source_hash,
+            'language': language,
+            'parser': parser,
+            'output': output_hash
+        }
+    @staticmethod
+    def is_current(entry: Optional[Dict[str, Any]], target: str, parser: Optional[str]) -> bool:
+        """True when entry was produced by this parser version and its output is still there"""
+        return bool(entry and parser and entry['target'] == os.path.abspath(target) and entry['parser'] == parser and os.path.exists(target))
+    @staticmethod
+    def is_fresh(entry: Optional[Dict[str, Any]], target: str, stat: os.stat_result, parser: Optional[str]) -> bool:
+        """is_current() for a source whose size and mtime have not moved since entry was recorded"""
+        return Manifest.is_current(entry, target, parser) and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns
\ No newline at end of file
@@ -0,0 +1,141 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = tuple(256 * 4 ** i for i in range(10))
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+def _number(value: float) -> str:
+    return str(int(value)) if value == int(value) else repr(value)
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str], lock: threading.Lock):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.lock = lock
+        self.values: Dict[Tuple[str, ...], float] = {}
+    def inc(self, amount: float, *labels: str):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+    def take(self) -> Dict[Tuple[str, ...], float]:
+        """Every value, leaving none; the caller holds the lock"""
+        values, self.values = self.values, {}
+        return values
+    def merge(self, values: Dict[Tuple[str, ...], float]):
+        """Add values taken from another process's counter; the caller holds the lock"""
+        for labels, value in values.items():
+            self.values[labels] = self.values.get(labels, 0) + value
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        for labels, value in sorted(self.values.items()):
+            lines.append(f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}')
+        return lines
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str], lock: threading.Lock, buckets: Sequence[float] = TIME_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.lock = lock
+        self.buckets = tuple(buckets)
+        self.series: Dict[Tuple[str, ...], List[float]] = {}
+    def observe(self, value: float, *labels: str):
+        """Count value in its bucket; a series is [per-bucket counts..., +Inf count, sum]"""
+        i = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [0] * (len(self.buckets) + 2)
+            series[i] += 1
+            series[-1] += value
+    def take(self) -> Dict[Tuple[str, ...], List[float]]:
+        """Every series, leaving none; the caller holds the lock"""
+        series, self.series = self.series, {}
+        return series
+    def merge(self, series: Dict[Tuple[str, ...], List[float]]):
+        """Add series taken from another process's histogram with the same buckets; the caller holds the lock"""
+        for labels, other in series.items():
+            mine = self.series.get(labels)
+            if mine is None:
+                self.series[labels] = list(other)
+            else:
+                self.series[labels] = [a + b for a, b in zip(mine, other)]
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for labels, series in sorted(self.series.items()):
+            total = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                total += count
+                le = '+Inf' if bound == float('inf') else _number(bound)
+                bucket = _labels(self.labelnames, labels, 'le="' + le + '"')
+                lines.append(f'{self.name}_bucket{bucket} {_number(total)}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {_number(total)}')
+        return lines
+class _Timer:
+    """Observes the seconds spent inside a with block"""
+    __slots__ = ('histogram', 'labels', 'started')
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+class _NullTimer:
+    __slots__ = ()
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        pass
+_NULL_TIMER = _NullTimer()
+class Registry:
+    """Counters and histograms rendered in the Prometheus text format
+
+    Instrumented code checks enabled (or uses timer(), which hands out a
+    shared no-op while disabled), so a disabled registry costs one attribute
+    lookup per call site.
+    """
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.metrics: List = []
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labelnames, self.lock)
+        self.metrics.append(metric)
+        return metric
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = TIME_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labelnames, self.lock, buckets)
+        self.metrics.append(metric)
+        return metric
+    def timer(self, histogram: Histogram, *labels: str):
+        return _Timer(histogram, labels) if self.enabled else _NULL_TIMER
+    def collect(self) -> Dict[str, Dict]:
+        """Every metric's values by name, emptying them: what a worker process recorded, for the parent to merge()"""
+        with self.lock:
+            return {metric.name: metric.take() for metric in self.metrics}
+    def merge(self, collected: Dict[str, Dict]):
+        """Add what collect() returned in another process running the same metrics"""
+        with self.lock:
+            for metric in self.metrics:
+                values = collected.get(metric.name)
+                if values:
+                    metric.merge(values)
+    def render(self) -> str:
+        with self.lock:
+            lines = [line for metric in self.metrics for line in metric.render()]
+        return '\n'.join(lines) + '\n'
+METRICS = Registry()
+REMOVE_SECONDS = METRICS.histogram('uncomment_remove_seconds', 'Time spent in CommentProcessor.remove_comments', ('language',))
+INPUT_SIZE = METRICS.histogram('uncomment_input_chars', 'Size of the code passed to remove_comments', ('language',), SIZE_BUCKETS)
+PROCESSED = METRICS.counter('uncomment_processed_total', 'remove_comments calls', ('language',))
+REMOVED = METRICS.counter('uncomment_comments_removed_total', 'Comments removed', ('language',))
+STAGE_SECONDS = METRICS.histogram('uncomment_stage_seconds', 'Time spent in each parser stage', ('parser', 'stage'))
+DETECT_SECONDS = METRICS.histogram('uncomment_detect_seconds', 'Time spent in LanguageDetector.detect')
+DETECTED = METRICS.counter('uncomment_detected_total', 'Languages returned by detection', ('language',))
\ No newline at end of file
@@ -1,25 +1,46 @@
-from .base_parser import BaseParser
-from .python_parser import PythonParser
-from .javascript_parser import JavaScriptParser
-from .typescript_parser import TypeScriptParser
-from .java_parser import JavaParser
-from .cpp_parser import CppParser
-from .c_parser import CParser
-from .csharp_parser import CSharpParser
-from .go_parser import GoParser
-from .rust_parser import RustParser
-from .php_parser import PhpParser
-from .ruby_parser import RubyParser
-from .swift_parser import SwiftParser
-from .kotlin_parser import KotlinParser
-from .scala_parser import ScalaParser
-from .html_parser import HtmlParser
-from .css_parser import CssParser
-from .sql_parser import SqlParser
+"""Parser registry: language name -> (module, class, file extensions)
+
+Parser modules are imported on first use, so loading the package (and
+building a CommentProcessor) costs nothing for languages a process never
+sees. The parser classes stay importable from here by name.
+"""
+from importlib import import_module
+from typing import Dict, Tuple
+PARSERS: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {
+    'python': ('python_parser', 'PythonParser', ('py',)),
+    'javascript': ('javascript_parser', 'JavaScriptParser', ('js',)),
+    'typescript': ('typescript_parser', 'TypeScriptParser', ('ts',)),
+    'java': ('java_parser', 'JavaParser', ('java',)),
+    'cpp': ('cpp_parser', 'CppParser', ('cpp', 'cc', 'cxx', 'hpp')),
+    'c': ('c_parser', 'CParser', ('c', 'h')),
+    'csharp': ('csharp_parser', 'CSharpParser', ('cs',)),
+    'go': ('go_parser', 'GoParser', ('go',)),
+    'rust': ('rust_parser', 'RustParser', ('rs',)),
+    'php': ('php_parser', 'PhpParser', ('php',)),
+    'ruby': ('ruby_parser', 'RubyParser', ('rb',)),
+    'swift': ('swift_parser', 'SwiftParser', ('swift',)),
+    'kotlin': ('kotlin_parser', 'KotlinParser', ('kt',)),
+    'scala': ('scala_parser', 'ScalaParser', ('scala',)),
+    'html': ('html_parser', 'HtmlParser', ('html', 'htm')),
+    'css': ('css_parser', 'CssParser', ('css',)),
+    'sql': ('sql_parser', 'SqlParser', ('sql',))
+}
+EXTENSIONS: Dict[str, str] = {extension: language for language, (_, _, extensions) in PARSERS.items() for extension in extensions}
+_MODULES: Dict[str, str] = {name: module for module, name, _ in PARSERS.values()}
+_MODULES['BaseParser'] = 'base_parser'
+def parser_class(language: str) -> type:
+    """The parser class for language, importing its module on first use; KeyError when unsupported"""
+    module, name, _ = PARSERS[language]
+    return getattr(import_module(f'{__name__}.{module}'), name)
+def __getattr__(name: str):
+    if name not in _MODULES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    return getattr(import_module(f'{__name__}.{_MODULES[name]}'), name)
 
 __all__ = [
     'BaseParser', 'PythonParser', 'JavaScriptParser', 'TypeScriptParser',
     'JavaParser', 'CppParser', 'CParser', 'CSharpParser', 'GoParser',
     'RustParser', 'PhpParser', 'RubyParser', 'SwiftParser', 'KotlinParser',
-    'ScalaParser', 'HtmlParser', 'CssParser', 'SqlParser'
+    'ScalaParser', 'HtmlParser', 'CssParser', 'SqlParser',
+    'PARSERS', 'EXTENSIONS', 'parser_class'
 ]
\ No newline at end of file
@@ -1,13 +1,92 @@
 import re
 from abc import ABC, abstractmethod
-from typing import Dict, List, Tuple, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union, Any
+from ..budget import checked
+from ..metrics import METRICS, STAGE_SECONDS
+from .buffers import Buffer, clean_whitespace
+from .recognizers import Recognizer
+from .scanner import OPENER_LOOKAHEAD, Scanner
+from .spans import TokenFinder
+from .whitespace import MAX_BLANK_LINES, TextWriter, join_lines
+STREAM_CHUNK_SIZE = 64 * 1024
+ZERO_COPY_SPACING = 1024
+PIECE_LOOKAHEAD = OPENER_LOOKAHEAD
+_TOP_LEVEL_LINE = re.compile(r'\n(?=[^\s/*#"\'`<-])')
+def split_pieces(code: str, count: int, search: int = 64 * 1024) -> List[Tuple[int, int]]:
+    """About count (start, end) ranges covering code, each ending at a line break (excluded) or the end
+
+    Each cut is placed before the first line within search characters of
+    its even share that starts in column 0 with something other than a
+    comment, string or markup character: such lines are nearly always
+    outside every comment and string. Failing that, any line break will do.
+    """
+    bounds = []
+    start = 0
+    for i in range(1, count):
+        target = max(len(code) * i // count, start)
+        match = _TOP_LEVEL_LINE.search(code, target, target + search)
+        cut = match.start() if match else code.find('\n', target)
+        if cut == -1:
+            break
+        if cut < start:
+            continue
+        bounds.append((start, cut))
+        start = cut + 1
+    bounds.append((start, len(code)))
+    return bounds
+def _split_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Lines of the concatenated chunks, as ''.join(chunks).split('\\n') would give them"""
+    pending = []
+    for chunk in chunks:
+        lines = chunk.split('\n')
+        if len(lines) == 1:
+            pending.append(chunk)
+            continue
+        pending.append(lines[0])
+        lines[0] = ''.join(pending)
+        pending = [lines.pop()]
+        yield from lines
+    yield ''.join(pending)
+def _join_lines(lines: Iterable[str], max_blank_lines: Optional[int] = None) -> Iterator[str]:
+    """join_lines(lines, max_blank_lines), emitted in chunks of about STREAM_CHUNK_SIZE characters"""
+    out = TextWriter(max_blank_lines)
+    size = 0
+    for i, line in enumerate(lines):
+        if i:
+            out.newlines(1)
+        out.write(line)
+        size += len(line) + 1
+        if size >= STREAM_CHUNK_SIZE:
+            yield out.take()
+            size = 0
+    text = out.text()
+    if text:
+        yield text
 class BaseParser(ABC):
-    def __init__(self):
-        self.string_patterns = []
-        self.comment_patterns = []
-        self.multiline_comment_patterns = []
+    """Comment remover for one language
+
+    Parsers are stateless: everything a call needs lives in its locals or in
+    per-call objects (token finders, span indexes, output builders), and the
+    shared compiled scanners are immutable once published. One instance can
+    serve any number of threads at once, e.g. from a shared ThreadPoolExecutor.
+
+    The output has trailing whitespace trimmed and runs of blank lines cut
+    to max_blank_lines, as it is written; a class whose max_blank_lines is
+    None leaves whitespace alone. Passing max_blank_lines overrides the
+    class default, None keeping it. drop_docstrings asks parsers of
+    languages with docstrings to remove those as well; others ignore it.
+    """
+    _scanners: Dict[type, Scanner] = {}
+    max_blank_lines: Optional[int] = MAX_BLANK_LINES
+    drop_docstrings = False
+    def __init__(self, max_blank_lines: Optional[int] = None, drop_docstrings: bool = False):
+        if max_blank_lines is not None:
+            self.max_blank_lines = max_blank_lines
+        if drop_docstrings:
+            self.drop_docstrings = drop_docstrings
     @abstractmethod
-    def get_string_patterns(self) -> List[str]:
+    def get_string_patterns(self) -> List[Union[str, Recognizer]]:
+        """String literal rules: regexes that start with a literal character, or Recognizers"""
         pass
     @abstractmethod
     def get_comment_patterns(self) -> List[str]:
@@ -15,98 +94,154 @@ class BaseParser(ABC):
     @abstractmethod
     def get_multiline_comment_patterns(self) -> List[Tuple[str, str]]:
         pass
+    def get_token_pattern(self) -> Optional[str]:
+        """One regex lexing the rules above while every literal closes (see Scanner), or None"""
+        return None
     def process(self, code: str) -> Dict[str, Any]:
         if not code:
             return {'cleaned_code': '', 'comments_removed': 0}
-        self.string_patterns = self.get_string_patterns()
-        self.comment_patterns = self.get_comment_patterns()
-        self.multiline_comment_patterns = self.get_multiline_comment_patterns()
-        string_positions = self._find_string_positions(code)
-        code, ml_removed = self._remove_multiline_comments(code, string_positions)
-        string_positions = self._find_string_positions(code)
-        code, sl_removed = self._remove_single_line_comments(code, string_positions)
-        code = self._clean_whitespace(code) 
+        with METRICS.timer(STAGE_SECONDS, type(self).__name__, 'scan'):
+            code, removed = self._scanner().scan(code, self.max_blank_lines)
         return {
             'cleaned_code': code,
-            'comments_removed': ml_removed + sl_removed
+            'comments_removed': removed
         }
-    def _find_string_positions(self, code: str) -> List[Tuple[int, int]]:
-        """Find all string literal positions to avoid processing comments inside them"""
-        positions = []
-        for pattern in self.string_patterns:
-            for match in re.finditer(pattern, code, re.DOTALL):
-                positions.append((match.start(), match.end()))
-        positions.sort()
-        merged = []
-        for start, end in positions:
-            if merged and start <= merged[-1][1]:
-                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
-            else:
-                merged.append((start, end))
-        return merged
-    def _is_in_string(self, pos: int, string_positions: List[Tuple[int, int]]) -> bool:
-        for start, end in string_positions:
-            if start <= pos < end:
-                return True
-        return False
-    def _remove_multiline_comments(self, code: str, string_positions: List[Tuple[int, int]]) -> Tuple[str, int]:
-        removed_count = 0
-        for start_pattern, end_pattern in self.multiline_comment_patterns:
-            while True:
-                start_match = re.search(start_pattern, code)
-                if not start_match or self._is_in_string(start_match.start(), string_positions):
-                    if start_match and self._is_in_string(start_match.start(), string_positions):
-                        temp_code = code[:start_match.start()] + 'X' * len(start_match.group()) + code[start_match.end():]
-                        next_match = re.search(start_pattern, temp_code[start_match.end():])
-                        if next_match:
-                            continue
-                    break
-                end_match = re.search(end_pattern, code[start_match.end():])
-                if not end_match:
-                    code = code[:start_match.start()]
-                    removed_count += 1
-                    break
-                comment_start = start_match.start()
-                comment_end = start_match.end() + end_match.end()
-                comment_text = code[comment_start:comment_end]
-                line_breaks = comment_text.count('\n')
-                replacement = '\n' * line_breaks
-                code = code[:comment_start] + replacement + code[comment_end:]
-                removed_count += 1
-                string_positions = self._find_string_positions(code)
-        return code, removed_count
-    def _remove_single_line_comments(self, code: str, string_positions: List[Tuple[int, int]]) -> Tuple[str, int]:
-        lines = code.split('\n')
-        removed_count = 0
-        for i, line in enumerate(lines):
-            for pattern in self.comment_patterns:
-                for match in re.finditer(pattern, line):
-                    if not self._is_in_string_line(match.start(), line, string_positions, i, code):
-                        lines[i] = line[:match.start()].rstrip()
-                        removed_count += 1
-                        break
-                if removed_count > len(lines) - len([l for l in lines if l.strip()]):
-                    break
-        return '\n'.join(lines), removed_count
-    def _is_in_string_line(self, pos: int, line: str, string_positions: List[Tuple[int, int]], line_num: int, full_code: str) -> bool:
-        lines_before = full_code.split('\n')[:line_num]
-        abs_pos = sum(len(l) + 1 for l in lines_before) + pos
-        return self._is_in_string(abs_pos, string_positions)
-    def _clean_whitespace(self, code: str) -> str:
-        lines = code.split('\n')
-        cleaned_lines = []
-        for line in lines:
+    def process_bytes(self, data) -> Tuple[List[Buffer], int]:
+        """process() on UTF-8 bytes, a memoryview or an mmap: (output buffers, comments removed)
 
-            cleaned_line = line.rstrip()
-            cleaned_lines.append(cleaned_line)
-        result_lines = []
-        empty_count = 0
-        for line in cleaned_lines:
-            if line.strip() == '':
-                empty_count += 1
-                if empty_count <= 2:
-                    result_lines.append(line)
-            else:
-                empty_count = 0
-                result_lines.append(line)
-        return '\n'.join(result_lines)
\ No newline at end of file
+        When comments are sparse the buffers are mostly memoryview slices of
+        data itself, so data must stay alive (and an mmap open) until they have
+        been written out. Denser input is cleaned as one joined copy, which is
+        faster than tracking thousands of small ranges.
+        """
+        if not len(data):
+            return [], 0
+        segments, removed = self._scanner().bytes_scanner().segments(data)
+        view = memoryview(data)
+        if self.max_blank_lines is None:
+            return [buffer for start, end, newlines in segments for buffer in (view[start:end], b'\n' * newlines) if buffer], removed
+        if len(segments) * ZERO_COPY_SPACING <= len(data):
+            return clean_whitespace(data, segments, self.max_blank_lines), removed
+        out = TextWriter(self.max_blank_lines, binary=True)
+        for start, end, newlines in segments:
+            out.write(bytes(view[start:end]))
+            out.newlines(newlines)
+        return [out.text()], removed
+    def process_piece(self, text: str, cut: int, final: bool) -> Tuple[str, int, bool]:
+        """process() on text[:cut], one piece of a larger input cut at a line break: (cleaned, removed, settled)
+
+        The piece is processed as if nothing were open where it starts; text
+        runs PIECE_LOOKAHEAD characters past cut unless final. settled says
+        nothing is still open at cut either, i.e. the next piece's assumption
+        holds; when it is False the result must be thrown away.
+        """
+        return self._scanner().scan_piece(text, cut, final, self.max_blank_lines)
+    def join_pieces(self, pieces: Iterable[str]) -> str:
+        """'\\n'.join() of consecutive cleaned pieces, collapsing blank lines across the seams as process() does"""
+        limit = self.max_blank_lines
+        if limit is None:
+            return '\n'.join(pieces)
+        out = []
+        blanks = 0
+        for piece in pieces:
+            lead = 0
+            while lead < len(piece) and piece[lead] == '\n':
+                lead += 1
+            empty = lead + 1 if lead == len(piece) else lead
+            drop = max(0, empty - max(0, limit - blanks))
+            if lead == len(piece):
+                if empty > drop:
+                    out.append('\n' * (empty - drop - 1))
+                blanks += empty - drop
+                continue
+            out.append(piece[drop:])
+            end = len(piece)
+            while piece[end - 1] == '\n':
+                end -= 1
+            blanks = len(piece) - end
+        return '\n'.join(out)
+    def process_stream(self, chunks: Iterable[str], stats: Optional[Dict[str, int]] = None) -> Iterator[str]:
+        """Streaming process(): yields cleaned chunks, filling stats['comments_removed'] as it goes"""
+        stats = {} if stats is None else stats
+        stats['comments_removed'] = 0
+        return self._scanner().stream(chunks, stats, self.max_blank_lines)
+    def _scanner(self) -> Scanner:
+        """Scanner compiled once per parser class and shared by every call; racing threads all get the first one stored"""
+        scanner = BaseParser._scanners.get(type(self))
+        if scanner is None:
+            scanner = Scanner(self.get_string_patterns(), self.get_comment_patterns(), self.get_multiline_comment_patterns(), self.get_token_pattern())
+            scanner = BaseParser._scanners.setdefault(type(self), scanner)
+        return scanner
+class LineParser(BaseParser):
+    """Base for parsers that clean code line by line, carrying state from one line to the next
+
+    _clean_lines must accept items holding several lines joined by '\\n' and
+    return them unchanged (or, inside a comment, as their newlines) whenever
+    they contain none of the tokens _prefilter_tokens() names. A parser whose
+    state carries from one line to the next must set stats['open'] to whether
+    it ended inside a comment or string, so process_piece() can tell.
+    Whitespace is left alone unless max_blank_lines is given, since trimming
+    would also reach into multi-line strings such as docstrings.
+    """
+    prefilter_tokens: Tuple[str, ...] = ()
+    max_blank_lines: Optional[int] = None
+    def process(self, code: str) -> Dict[str, Any]:
+        if not code:
+            return {'cleaned_code': '', 'comments_removed': 0}
+        stats = {'comments_removed': 0}
+        with METRICS.timer(STAGE_SECONDS, type(self).__name__, 'lines'):
+            cleaned_code = join_lines(self._clean_lines(checked(self._touched_lines(code)), stats), self.max_blank_lines)
+        return {
+            'cleaned_code': cleaned_code,
+            'comments_removed': stats['comments_removed']
+        }
+    def process_piece(self, text: str, cut: int, final: bool) -> Tuple[str, int, bool]:
+        stats = {'comments_removed': 0}
+        cleaned = join_lines(self._clean_lines(checked(self._touched_lines(text[:cut])), stats), self.max_blank_lines)
+        return cleaned, stats['comments_removed'], final or not stats.get('open', False)
+    def process_bytes(self, data) -> Tuple[List[Buffer], int]:
+        """Line parsers work on text, so this decodes, processes and encodes again"""
+        result = self.process(str(data, 'utf-8'))
+        return [result['cleaned_code'].encode('utf-8')], result['comments_removed']
+    @classmethod
+    def _prefilter_tokens(cls) -> Tuple[str, ...]:
+        """Tokens without which a line cannot contain or end a comment or string"""
+        return cls.prefilter_tokens
+    def _touched_lines(self, code: str) -> Iterator[str]:
+        """code.split('\\n'), except that each run of lines without a prefilter token comes as one item"""
+        tokens = self._prefilter_tokens()
+        if not tokens:
+            yield from code.split('\n')
+            return
+        finder = TokenFinder(code, tokens)
+        end = len(code)
+        pos = 0
+        while True:
+            hit = finder.next(pos)
+            if hit == end:
+                yield code[pos:]
+                return
+            line_start = code.rfind('\n', pos, hit) + 1
+            if line_start == 0:
+                line_start = pos
+            elif line_start > pos:
+                yield code[pos:line_start - 1]
+            line_end = code.find('\n', hit)
+            if line_end == -1:
+                yield code[line_start:]
+                return
+            yield code[line_start:line_end]
+            pos = line_end + 1
+    def process_stream(self, chunks: Iterable[str], stats: Optional[Dict[str, int]] = None) -> Iterator[str]:
+        stats = {} if stats is None else stats
+        stats['comments_removed'] = 0
+        return _join_lines(self._clean_lines(checked(_split_lines(chunks)), stats), self.max_blank_lines)
+    @abstractmethod
+    def _clean_lines(self, lines: Iterable[str], stats: Dict[str, int]) -> Iterator[str]:
+        pass
+    def get_string_patterns(self) -> List[str]:
+        return []
+    def get_comment_patterns(self) -> List[str]:
+        return []
+    def get_multiline_comment_patterns(self) -> List[Tuple[str, str]]:
+        return []
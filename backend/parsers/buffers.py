@@ -0,0 +1,141 @@
+import os
+from typing import List, Optional, Sequence, Tuple, Union
+from .spans import TokenFinder
+from .whitespace import MAX_BLANK_LINES
+Buffer = Union[bytes, memoryview]
+WHITESPACE = b' \t\r\x0b\x0c'
+IOV_MAX = 1024
+class _Output:
+    """Kept lines as buffers, merging ranges that are contiguous in the input into one view
+
+    Each line's break is only written once the next kept line arrives, so
+    dropped trailing blank lines take their separator with them, exactly as
+    '\\n'.join() of the kept lines would.
+    """
+    def __init__(self, data, max_blank_lines: int):
+        self.data = data
+        self.limit = max_blank_lines
+        self.view = memoryview(data)
+        self.buffers: List[Buffer] = []
+        self.start = self.end = -1
+        self.blanks = 0
+        self.started = False
+        self.newline: Optional[int] = None
+    def _range(self, start: int, end: int):
+        if start == end:
+            return
+        if start != self.end:
+            self._flush()
+            self.start = start
+        self.end = end
+    def _flush(self):
+        if self.end > self.start:
+            self.buffers.append(self.view[self.start:self.end])
+        self.start = self.end = -1
+    def _separator(self):
+        if not self.started:
+            self.started = True
+        elif self.newline is None:
+            self._flush()
+            self.buffers.append(b'\n')
+        else:
+            self._range(self.newline, self.newline + 1)
+    def line(self, pieces: List[List[int]], newline: Optional[int]):
+        """One output line made of input ranges, ended by the break at newline (None: a literal one)"""
+        data = self.data
+        while pieces:
+            piece = pieces[-1]
+            while piece[1] > piece[0] and data[piece[1] - 1] in WHITESPACE:
+                piece[1] -= 1
+            if piece[1] > piece[0]:
+                break
+            pieces.pop()
+        if pieces:
+            self.blanks = 0
+        else:
+            self.blanks += 1
+            if self.blanks > self.limit:
+                return
+        self._separator()
+        for start, end in pieces:
+            self._range(start, end)
+        pieces.clear()
+        self.newline = newline
+    def run(self, start: int, end: int):
+        """The clean lines in data[start:end], where end holds the break after the last of them"""
+        data = self.data
+        while data[start] == 10:
+            self.line([], start)
+            if start == end:
+                return
+            start += 1
+        self._separator()
+        self._range(start, end)
+        self.newline = end
+        blanks = 0
+        while blanks < self.limit and data[end - 1 - blanks] == 10:
+            blanks += 1
+        self.blanks = blanks
+    def finish(self) -> List[Buffer]:
+        self._flush()
+        return self.buffers
+def clean_whitespace(data, segments: Sequence[Tuple[int, int, int]], max_blank_lines: int = MAX_BLANK_LINES) -> List[Buffer]:
+    """TextWriter's whitespace normalization over Scanner.segments(), without copying unchanged bytes
+
+    Only lines that end in whitespace or would be one blank line too many
+    are trimmed one by one; the runs of lines between them are passed
+    through as views. Only ASCII whitespace is stripped.
+    """
+    output = _Output(data, max_blank_lines)
+    tokens = [bytes([char]) + b'\n' for char in WHITESPACE if data.find(bytes([char])) != -1]
+    finder = TokenFinder(data, tokens + [b'\n' * (max_blank_lines + 2)])
+    pieces: List[List[int]] = []
+    for start, end, newlines in segments:
+        first = data.find(b'\n', start, end)
+        if first == -1:
+            if end > start:
+                pieces.append([start, end])
+        else:
+            pieces.append([start, first])
+            output.line(pieces, first)
+            last = data.rfind(b'\n', first, end)
+            pos = first + 1
+            while pos <= last:
+                hit = finder.next(pos - 1)
+                dirty = hit + 1 if hit < last and data[hit] != 10 else hit + max_blank_lines + 1
+                if dirty > last:
+                    output.run(pos, last)
+                    break
+                line_start = max(pos, data.rfind(b'\n', pos, dirty) + 1)
+                if line_start > pos:
+                    output.run(pos, line_start - 1)
+                pieces.append([line_start, dirty])
+                output.line(pieces, dirty)
+                pos = dirty + 1
+            if last + 1 < end:
+                pieces.append([last + 1, end])
+        for _ in range(newlines):
+            output.line(pieces, None)
+    output.line(pieces, None)
+    return output.finish()
+def write_buffers(fd: int, buffers: Sequence[Buffer]):
+    """Write every buffer to the file descriptor fd, with os.writev where the platform has it"""
+    if not hasattr(os, 'writev'):
+        for buffer in buffers:
+            view = memoryview(buffer)
+            while view:
+                view = view[os.write(fd, view):]
+        return
+    pending = [memoryview(buffer) for buffer in buffers if len(buffer)]
+    while pending:
+        batch = pending[:IOV_MAX]
+        written = os.writev(fd, batch)
+        done = 0
+        for buffer in batch:
+            if written < len(buffer):
+                break
+            written -= len(buffer)
+            done += 1
+        if done < len(batch):
+            pending[done] = pending[done][written:]
+        pending = pending[done:]
\ No newline at end of file
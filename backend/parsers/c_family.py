@@ -0,0 +1,154 @@
+import re
+from functools import partial
+from typing import Dict, Iterable, Iterator, Optional, Pattern, Tuple
+from ..budget import CHECK_INTERVAL, check
+from .base_parser import LineParser
+_BLOCK_END = re.compile(r'.*?\*/')
+_RAW_OPENER = r'(?<!\w)(?:u8|[uUL])?R"(?P<delim>[^()\\\s"]{0,16})\('
+SEARCH_WINDOW = 64 * 1024
+OPENER_SPAN = 32
+def _windowed(search, line: str, pos: int):
+    """search(line, pos) over SEARCH_WINDOW characters at a time, checking the budget between windows
+
+    One search over a long line is a single regex call the budget cannot
+    interrupt. Every opener is shorter than OPENER_SPAN, so a match starting
+    inside a window is found in full and is the one a plain search finds.
+    """
+    while True:
+        end = pos + SEARCH_WINDOW
+        match = search(line, pos, end + OPENER_SPAN)
+        if end >= len(line) or (match is not None and match.start() < end):
+            return match
+        check()
+        pos = end
+class CFamilyParser(LineParser):
+    """Line-based cleaner shared by the C-family languages.
+
+    Each line is walked once: a trigger regex jumps straight to the next
+    comment or string opener and the matching end pattern skips the whole
+    literal, so kept text is sliced out once instead of rebuilt per comment.
+    Subclasses describe their dialect with the class attributes below.
+    """
+    quotes = '"\''
+    multiline_quotes = ''
+    verbatim_strings = False
+    raw_strings = False
+    text_blocks = False
+    url_guard: Optional[str] = None
+    _tokenizers: Dict[type, Tuple[Pattern, Dict[str, Tuple[Pattern, bool]], str]] = {}
+    @classmethod
+    def _tokenizer(cls) -> Tuple[Pattern, Dict[str, Tuple[Pattern, bool]], str]:
+        """(trigger regex, opener -> (end pattern, may span lines), mark), built once per dialect
+
+        Every multi-line string opener contains mark, so a line with neither
+        mark nor '/' can be passed through without tokenizing it.
+        """
+        tokenizer = CFamilyParser._tokenizers.get(cls)
+        if tokenizer is None:
+            ends: Dict[str, Tuple[Pattern, bool]] = {}
+            if cls.text_blocks:
+                ends['"""'] = (re.compile(r'(?:[^"\\]|\\.|"(?!""))*"""'), True)
+            if cls.verbatim_strings:
+                for opener in ('@"', '@$"', '$@"'):
+                    ends[opener] = (re.compile(r'(?:[^"]|"")*"(?!")'), True)
+            for quote in cls.multiline_quotes:
+                ends[quote] = (re.compile(f'(?:[^{quote}\\\\]|\\\\.)*{quote}'), True)
+            for quote in cls.quotes:
+                ends[quote] = (re.compile(f'(?:[^{quote}\\\\]|\\\\.)*{quote}'), False)
+            openers = [re.escape(opener) for opener in ends]
+            marks = [opener for opener, (_, multiline) in ends.items() if multiline]
+            if cls.raw_strings:
+                openers.insert(0, _RAW_OPENER)
+                marks.append('R"')
+            common = set(marks[0]).intersection(*marks[1:]) if marks else {'\n'}
+            mark = marks[0] if len(marks) == 1 else min(common - set(cls.quotes) or common or {''})
+            tokenizer = (re.compile('|'.join(['//', r'/\*'] + openers)), ends, mark)
+            tokenizer = CFamilyParser._tokenizers.setdefault(cls, tokenizer)
+        return tokenizer
+    @classmethod
+    def _prefilter_tokens(cls) -> Tuple[str, ...]:
+        """'/' plus whatever can open or close a multi-line string"""
+        tokens = {'/', cls._tokenizer()[2]} - {'', '\n'}
+        if cls.verbatim_strings or cls.raw_strings:
+            tokens.add('"')
+        return tuple(sorted(token for token in tokens if not any(other != token and other in token for other in tokens)))
+    def _is_url(self, line: str, pos: int) -> bool:
+        """Whether the // at pos belongs to a URL rather than starting a comment"""
+        if self.url_guard == 'http':
+            return line.endswith(('http:', 'https:'), 0, pos)
+        if self.url_guard == 'colon':
+            return line[pos - 1:pos] == ':'
+        return False
+    def _clean_lines(self, lines: Iterable[str], stats: Dict[str, int]) -> Iterator[str]:
+        trigger, ends, mark = self._tokenizer()
+        search_line = trigger.search
+        search_windows = partial(_windowed, search_line)
+        url_guard = self.url_guard
+        closer = None
+        in_comment = False
+        steps = 0
+        for line in lines:
+            search = search_line if len(line) <= SEARCH_WINDOW else search_windows
+            if closer is None:
+                if '/' not in line and mark not in line:
+                    yield line
+                    continue
+                pos = start = 0
+            else:
+                match = closer.match(line)
+                if not match:
+                    yield '\n' * line.count('\n') if in_comment else line
+                    continue
+                pos = match.end()
+                start = pos if in_comment else 0
+                closer = None
+                in_comment = False
+            match = search(line, pos)
+            if match is None:
+                yield line[start:] if start else line
+                continue
+            pieces = []
+            cut = False
+            while match:
+                steps += 1
+                if not steps % CHECK_INTERVAL:
+                    check()
+                token = match.group()
+                i = match.start()
+                if token == '//':
+                    if url_guard and self._is_url(line, i):
+                        match = search(line, i + 2)
+                        continue
+                    cut = True
+                    stats['comments_removed'] += 1
+                    break
+                if token == '/*':
+                    stats['comments_removed'] += 1
+                    end = line.find('*/', i + 2)
+                    if end == -1:
+                        closer = _BLOCK_END
+                        in_comment = cut = True
+                        break
+                    pieces.append(line[start:i])
+                    start = end + 2
+                    match = search(line, start)
+                    continue
+                if match.lastgroup == 'delim':
+                    end_pattern, multiline = re.compile('.*?' + re.escape(')' + match.group('delim') + '"')), True
+                else:
+                    end_pattern, multiline = ends[token]
+                end_match = end_pattern.match(line, match.end())
+                if end_match:
+                    match = search(line, end_match.end())
+                    continue
+                if multiline:
+                    closer = end_pattern
+                break
+            tail = line[start:i].rstrip() if cut else line[start:]
+            if pieces:
+                pieces.append(tail)
+                tail = ''.join(pieces)
+                if cut:
+                    tail = tail.rstrip()
+            yield tail
+        stats['open'] = closer is not None
\ No newline at end of file
@@ -1,11 +1,12 @@
 from .base_parser import BaseParser
+from .recognizers import Quoted, Recognizer
 from typing import List, Tuple
 
 class CssParser(BaseParser):
-    def get_string_patterns(self) -> List[str]:
+    def get_string_patterns(self) -> List[Recognizer]:
         return [
-            r'"(?:[^"\\]|\\.)*"',  
-            r"'(?:[^'\\]|\\.)*'",  
+            Quoted('"'),  
+            Quoted("'"),  
         ]
     
     def get_comment_patterns(self) -> List[str]:
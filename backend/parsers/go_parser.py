@@ -1,12 +1,13 @@
 from .base_parser import BaseParser
+from .recognizers import Delimited, Quoted, Recognizer
 from typing import List, Tuple
 
 class GoParser(BaseParser):
-    def get_string_patterns(self) -> List[str]:
+    def get_string_patterns(self) -> List[Recognizer]:
         return [
-            r'"(?:[^"\\]|\\.)*"',  
-            r"'(?:[^'\\]|\\.)*'",  
-            r'`[^`]*`',            
+            Quoted('"'),  
+            Quoted("'"),  
+            Delimited('`', '`'),            
         ]
     
     def get_comment_patterns(self) -> List[str]:
@@ -1,12 +1,13 @@
 from .base_parser import BaseParser
+from .recognizers import Heredoc, Quoted, Recognizer
 from typing import List, Tuple
 
 class PhpParser(BaseParser):
-    def get_string_patterns(self) -> List[str]:
+    def get_string_patterns(self) -> List[Recognizer]:
         return [
-            r'"(?:[^"\\]|\\.)*"',
-            r"'(?:[^'\\]|\\.)*'",
-            r'<<<["\']?(\w+)["\']?.*?\n\1;',
+            Quoted('"'),
+            Quoted("'"),
+            Heredoc(),
         ]
     
     def get_comment_patterns(self) -> List[str]:
@@ -1,101 +1,216 @@
-from .base_parser import BaseParser
-from typing import List, Tuple
 import re
+from bisect import bisect_right
+from ..budget import CHECK_INTERVAL, check, checked
+from ..metrics import METRICS, STAGE_SECONDS
+from .base_parser import BaseParser
+from .buffers import Buffer
+from .recognizers import Quoted, Recognizer
+from .scanner import LINE_COMMENT, STRING
+from .whitespace import TextWriter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+_KEYWORDS = (re.compile(r'def\b'), re.compile(r'class\b'))
+_HEADER_CHARS = re.compile(r'[:()[\]{}]')
+_CODE = re.compile(r'\S')
+_TRIPLE = r'{0}{0}{0}[^{0}\\]*(?:(?:\\.|{0}(?!{0}{0}))[^{0}\\]*)*{0}{0}{0}'
+_SINGLE = r'{0}[^{0}\\\n]*(?:\\.[^{0}\\\n]*)*{0}'
+_TOKENS = '|'.join([
+    f'(?P<{LINE_COMMENT}>#[^\\n]*)',
+    f'(?P<{STRING}>' + '|'.join([_TRIPLE.format('"'), _TRIPLE.format("'"), '(?!"""|\'\'\')' + _SINGLE.format('"'), _SINGLE.format("'")]) + ')',
+    '["\']'
+])
+class _Headers:
+    """Where the def and class headers of one module end, each found on first use
 
-class PythonParser(BaseParser):
-    def process(self, code: str):
-        """Optimized Python comment removal"""
-        if not code:
-            return {'cleaned_code': '', 'comments_removed': 0}
-        
-        lines = code.split('\n')
-        cleaned_lines = []
-        comments_removed = 0
-        
-        for line in lines:
-            cleaned_line, removed = self._process_line(line)
-            cleaned_lines.append(cleaned_line)
-            comments_removed += removed
-        
-        return {
-            'cleaned_code': '\n'.join(cleaned_lines),
-            'comments_removed': comments_removed
-        }
-    
-    def _process_line(self, line: str):
-        """Process single line for Python comments with maximum error handling"""
-        if not line.strip():
-            return line, 0
-        
-
-        if '#' not in line:
-            return line, 0
-        
-
-        in_string = False
-        string_char = None
-        escape_next = False
-        i = 0
-        
-        while i < len(line):
-            char = line[i]
-            
-
-            if escape_next:
-                escape_next = False
-                i += 1
-                continue
-            
-            if char == '\\':
-                escape_next = True
-                i += 1
+    A header runs from its keyword to the first colon outside brackets,
+    strings and comments. It is only searched for up to the next header,
+    so no part of the module is searched twice.
+    """
+    def __init__(self, code: str, tokens: List[Tuple[str, int, int]]):
+        self.code = code
+        self.tokens = tokens
+        self.token_starts = [start for _, start, _ in tokens]
+        self.starts = sorted(
+            start for keyword in _KEYWORDS for found in checked(keyword.finditer(code))
+            for start in (self._line_start(found.start()),) if start != -1 and self._token_at(start) is None
+        )
+        self.ends: Dict[int, int] = {}
+    def ends_at(self, colon: int) -> bool:
+        """Whether the colon at colon ends a def or class header"""
+        i = bisect_right(self.starts, colon) - 1
+        if i < 0:
+            return False
+        end = self.ends.get(i)
+        if end is None:
+            limit = self.starts[i + 1] if i + 1 < len(self.starts) else len(self.code)
+            end = self.ends[i] = self._end(self.starts[i], limit)
+        return end == colon
+    def _end(self, pos: int, limit: int) -> int:
+        depth = 0
+        steps = 0
+        while True:
+            steps += 1
+            if not steps % CHECK_INTERVAL:
+                check()
+            found = _HEADER_CHARS.search(self.code, pos, limit)
+            if not found:
+                return -1
+            pos = found.start()
+            token = self._token_at(pos)
+            if token is not None:
+                pos = self.tokens[token][2]
                 continue
-            
-
-            if not in_string and char in ['"', "'"]:
-
-                if i + 2 < len(line) and line[i:i+3] == char * 3:
-
-                    end_pos = line.find(char * 3, i + 3)
-                    if end_pos != -1:
-                        i = end_pos + 3
-                        continue
-                    else:
-
-                        in_string = True
-                        string_char = char
-                        i += 3
-                        continue
-                
-
-                if i > 0 and line[i-1].lower() in ['r', 'f', 'b', 'u']:
-                    in_string = True
-                    string_char = char
-                elif i > 1 and line[i-2:i].lower() in ['rf', 'fr', 'rb', 'br']:
-                    in_string = True
-                    string_char = char
-                else:
-                    in_string = True
-                    string_char = char
-            
-            elif in_string and char == string_char:
-                in_string = False
-                string_char = None
-            
-
-            elif not in_string and char == '#':
+            char = found.group()
+            if char == ':':
+                if not depth:
+                    return pos
+            elif char in '([{':
+                depth += 1
+            else:
+                depth -= 1
+            pos += 1
+    def _line_start(self, keyword: int) -> int:
+        """Start of the line when only indentation and async come before keyword on it, else -1"""
+        code = self.code
+        start = keyword
+        while start and code[start - 1] in ' \t':
+            start -= 1
+        if start < keyword and code[start - 5:start] == 'async':
+            start -= 5
+            while start and code[start - 1] in ' \t':
+                start -= 1
+        return start if not start or code[start - 1] == '\n' else -1
+    def _token_at(self, pos: int) -> Optional[int]:
+        i = bisect_right(self.token_starts, pos) - 1
+        return i if i >= 0 and pos < self.tokens[i][2] else None
+class PythonParser(BaseParser):
+    """Whole-file Python scanner: triple-quoted strings span lines, other strings end at the line
 
-                return line[:i].rstrip(), 1
-            
-            i += 1
-        
-        return line, 0
-    
-    def get_string_patterns(self) -> List[str]:
-        return []
-    
+    String prefixes (r, b, f, u and their pairs) need no rules of their own:
+    a backslash before a quote keeps it from closing the string in raw
+    strings too, so every literal ends where its plain form would.
+    Whitespace is left alone by default, since trimming would also reach
+    into multi-line strings. With drop_docstrings, module, class and
+    function docstrings are removed too and counted with the comments:
+    their line breaks are kept, and pass stands in where the body would
+    otherwise be empty. Telling a docstring apart takes the whole module,
+    so streams and parallel pieces are then cleaned in one pass.
+    """
+    max_blank_lines: Optional[int] = None
+    def get_string_patterns(self) -> List[Recognizer]:
+        return [
+            Quoted('"""'),
+            Quoted("'''"),
+            Quoted('"', multiline=False),
+            Quoted("'", multiline=False),
+        ]
     def get_comment_patterns(self) -> List[str]:
-        return []
-    
+        return [r'#.*$']
     def get_multiline_comment_patterns(self) -> List[Tuple[str, str]]:
-        return []
\ No newline at end of file
+        return []
+    def get_token_pattern(self) -> str:
+        return _TOKENS
+    def process(self, code: str) -> Dict[str, Any]:
+        if not self.drop_docstrings or not code:
+            return super().process(code)
+        scanner = self._scanner()
+        with METRICS.timer(STAGE_SECONDS, type(self).__name__, 'scan'):
+            tokens = list(scanner.tokens(code))
+        headers = _Headers(code, tokens)
+        out = TextWriter(self.max_blank_lines)
+        removed = 0
+        last = 0
+        for i, (kind, start, end) in enumerate(tokens):
+            if kind == STRING:
+                docstring = self._docstring(code, tokens, i, headers)
+                if docstring is None:
+                    continue
+                start, body = docstring
+                out.write(code[last:start])
+                if body:
+                    out.write('pass')
+                out.newlines(code.count('\n', start, end))
+            else:
+                out.write(code[last:scanner._kept_end(code, last, start, kind)])
+            last = end
+            removed += 1
+        out.write(code[last:])
+        return {
+            'cleaned_code': out.text(),
+            'comments_removed': removed
+        }
+    def process_bytes(self, data) -> Tuple[List[Buffer], int]:
+        if not self.drop_docstrings:
+            return super().process_bytes(data)
+        result = self.process(str(data, 'utf-8'))
+        return [result['cleaned_code'].encode('utf-8')], result['comments_removed']
+    def process_piece(self, text: str, cut: int, final: bool) -> Tuple[str, int, bool]:
+        if not self.drop_docstrings:
+            return super().process_piece(text, cut, final)
+        if not final:
+            return '', 0, False
+        result = self.process(text[:cut])
+        return result['cleaned_code'], result['comments_removed'], True
+    def process_stream(self, chunks: Iterable[str], stats: Optional[Dict[str, int]] = None) -> Iterator[str]:
+        if not self.drop_docstrings:
+            return super().process_stream(chunks, stats)
+        stats = {} if stats is None else stats
+        result = self.process(''.join(chunks))
+        stats['comments_removed'] = result['comments_removed']
+        return iter([result['cleaned_code']] if result['cleaned_code'] else [])
+    def _docstring(self, code: str, tokens: List[Tuple[str, int, int]], i: int, headers: _Headers) -> Optional[Tuple[int, bool]]:
+        """(where removal starts, whether pass must stand in) when string token i is a docstring, else None
+
+        A docstring is a string alone on its logical line that is the first
+        statement of the module or follows a def or class header.
+        """
+        _, start, end = tokens[i]
+        line_start = start - 1 if code[start - 1:start] in ('r', 'R', 'u', 'U') else start
+        while line_start and code[line_start - 1] in ' \t':
+            line_start -= 1
+        if line_start and code[line_start - 1] != '\n':
+            return None
+        line_end = code.find('\n', end)
+        rest = code[end:len(code) if line_end == -1 else line_end].strip()
+        if rest and rest[0] != '#':
+            return None
+        previous = self._previous_code(code, tokens, i, line_start)
+        if previous == -1:
+            return line_start, False
+        if code[previous] != ':' or not headers.ends_at(previous):
+            return None
+        indent = len(code[line_start:start]) - len(code[line_start:start].lstrip(' \t'))
+        if self._next_indent(code, tokens, i) >= indent:
+            return line_start, False
+        return line_start + indent, True
+    def _previous_code(self, code: str, tokens: List[Tuple[str, int, int]], i: int, pos: int) -> int:
+        """Position of the last character of code before pos, skipping whitespace and comments; -1 when there is none"""
+        j = i - 1
+        while True:
+            gap_start = tokens[j][2] if j >= 0 else 0
+            gap = code[gap_start:pos].rstrip()
+            if gap:
+                return gap_start + len(gap) - 1
+            if j < 0:
+                return -1
+            if tokens[j][0] == STRING:
+                return tokens[j][2] - 1
+            pos = tokens[j][1]
+            j -= 1
+    def _next_indent(self, code: str, tokens: List[Tuple[str, int, int]], i: int) -> int:
+        """Indentation of the next line of code after string token i, skipping comments; -1 at the end of the file"""
+        pos = tokens[i][2]
+        j = i + 1
+        while True:
+            gap_end = tokens[j][1] if j < len(tokens) else len(code)
+            found = _CODE.search(code, pos, gap_end)
+            if found:
+                first = found.start()
+                break
+            if j == len(tokens):
+                return -1
+            if tokens[j][0] == STRING:
+                first = tokens[j][1]
+                break
+            pos = tokens[j][2]
+            j += 1
+        return first - code.rfind('\n', 0, first) - 1
\ No newline at end of file
@@ -0,0 +1,196 @@
+import re
+from bisect import bisect_left
+from typing import Any, Dict, List, Pattern
+from ..budget import checked
+NO_MATCH = -1
+NEED_MORE = -2
+_PAIRS = {'(': ')', '[': ']', '{': '}', '<': '>'}
+class Recognizer:
+    """A string literal rule that the Scanner runs as code rather than as one regex
+
+    match(code, start, final, memo) returns the end of the literal starting
+    at start, NO_MATCH, or, when final is False and more text may follow,
+    NEED_MORE. code is str, or bytes-like for an instance compiled with
+    binary=True. memo is a dict private to one scan in which a recognizer
+    keeps what it learnt about the text, such as where its closer is known
+    to be absent. That keeps a whole scan linear: an unterminated literal is
+    searched to the end once, not once per opener.
+    """
+    prefix = ''
+    def __init__(self, *args: str, binary: bool = False):
+        self.args = args
+        self.binary = binary
+    def compile(self, binary: bool) -> 'Recognizer':
+        """This recognizer set up for bytes (binary) or str input"""
+        return self if binary == self.binary else type(self)(*self.args, binary=binary)
+    def match(self, code, start: int, final: bool, memo: Dict[Any, Any]) -> int:
+        raise NotImplementedError
+    def _text(self, text: str):
+        return text.encode('ascii') if self.binary else text
+    def _regex(self, pattern: str, flags: int = 0) -> Pattern:
+        return re.compile(self._text(pattern), flags)
+    def _find(self, code, needle, start: int, key: Any, memo: Dict[Any, Any], final: bool) -> int:
+        """End of the first needle at or after start; the miss is remembered under key, since later starts miss too"""
+        absent = memo.get(key)
+        if absent is None or start < absent:
+            end = code.find(needle, start)
+            if end != -1:
+                return end + len(needle)
+            memo[key] = start
+        return NO_MATCH if final else NEED_MORE
+    def __repr__(self):
+        return f'{type(self).__name__}{self.args!r}'
+class Delimited(Recognizer):
+    """opener ... closer with nothing escaped, ending at the first closer: Delimited('\"\"\"', '\"\"\"'), Delimited('`', '`')"""
+    def __init__(self, opener: str, closer: str, binary: bool = False):
+        super().__init__(opener, closer, binary=binary)
+        self.prefix = opener
+        self.opener = self._text(opener)
+        self.closer = self._text(closer)
+    def match(self, code, start: int, final: bool, memo: Dict[Any, Any]) -> int:
+        if code[start:start + len(self.opener)] != self.opener:
+            return NO_MATCH
+        return self._find(code, self.closer, start + len(self.opener), self, memo, final)
+class Quoted(Recognizer):
+    """prefix + quote ... quote, where a backslash escapes the next character: Quoted('\"'), Quoted(\"'\", 'b'), Quoted('\"\"\"')
+
+    Whether a quote is escaped only depends on the backslashes right before
+    it, so the closer found from one opener is the closer for every later
+    one too; once there is none, there is none for any later opener. With
+    multiline=False an unescaped line break ends the literal unclosed, and
+    the stretch up to it is remembered instead, since openers inside it
+    fail the same way.
+    """
+    def __init__(self, quote: str, prefix: str = '', multiline: bool = True, binary: bool = False):
+        super().__init__(quote, prefix, multiline, binary=binary)
+        self.prefix = prefix + quote
+        self.opener = self._text(self.prefix)
+        self.quote = self._text(quote)
+        self.multiline = multiline
+        first = re.escape(quote[0])
+        stop = first if multiline else f'{first}\\n'
+        inner = f'\\\\.|{first}(?!{re.escape(quote[1:])})' if len(quote) > 1 else '\\\\.'
+        body = f'{re.escape(prefix)}{re.escape(quote)}[^{stop}\\\\]*(?:(?:{inner})[^{stop}\\\\]*)*'
+        self.pattern = self._regex(body + re.escape(quote) if multiline else body, re.DOTALL)
+    def match(self, code, start: int, final: bool, memo: Dict[Any, Any]) -> int:
+        if not self.multiline:
+            return self._match_line(code, start, final, memo)
+        absent = memo.get(self)
+        if absent is None or start < absent:
+            found = self.pattern.match(code, start)
+            if found:
+                return found.end()
+        if code[start:start + len(self.opener)] != self.opener:
+            return NO_MATCH
+        if absent is None or start < absent:
+            memo[self] = start
+        return NO_MATCH if final else NEED_MORE
+    def _match_line(self, code, start: int, final: bool, memo: Dict[Any, Any]) -> int:
+        stretch = memo.get(self)
+        if stretch is None or not stretch[0] <= start <= stretch[1]:
+            found = self.pattern.match(code, start)
+            if not found:
+                return NO_MATCH
+            end = found.end()
+            if code[end:end + len(self.quote)] == self.quote:
+                return end + len(self.quote)
+            stretch = memo[self] = (start, end)
+        elif code[start:start + len(self.opener)] != self.opener:
+            return NO_MATCH
+        return NEED_MORE if stretch[1] == len(code) and not final else NO_MATCH
+class RawString(Recognizer):
+    """Rust's r\"...\", r#\"...\"#, r##\"...\"##: the closer is a quote followed by as many hashes as the opener has"""
+    def __init__(self, binary: bool = False):
+        super().__init__(binary=binary)
+        self.prefix = 'r'
+        self.opener = self._regex(r'r(#*)"')
+    def match(self, code, start: int, final: bool, memo: Dict[Any, Any]) -> int:
+        found = self.opener.match(code, start)
+        if not found:
+            return NO_MATCH
+        hashes = found.end(1) - found.start(1)
+        return self._find(code, self._text('"' + '#' * hashes), found.end(), (self, hashes), memo, final)
+class Heredoc(Recognizer):
+    """PHP's <<<LABEL (also quoted) heredoc and nowdoc, running up to a line that starts with LABEL;
+
+    The label is the whole identifier after <<<. Closing lines are indexed
+    once per scan, so each heredoc costs a lookup rather than a search of
+    the rest of the text.
+    """
+    def __init__(self, binary: bool = False):
+        super().__init__(binary=binary)
+        self.prefix = '<<<'
+        label = '[A-Za-z0-9_\\x80-\\xff]+' if binary else '[A-Za-z0-9_\\u0080-\\U0010ffff]+'
+        self.opener = self._regex(f'<<<["\']?({label})["\']?')
+        self.closers = self._regex(f'\\n({label});')
+    def match(self, code, start: int, final: bool, memo: Dict[Any, Any]) -> int:
+        found = self.opener.match(code, start)
+        if not found:
+            return NO_MATCH
+        index = memo.get(self)
+        if index is None:
+            index = memo[self] = {}
+            for closer in checked(self.closers.finditer(code)):
+                index.setdefault(closer.group(1), []).append(closer.start())
+        label = found.group(1)
+        positions: List[int] = index.get(label, [])
+        i = bisect_left(positions, found.end())
+        if i < len(positions):
+            return positions[i] + len(label) + 2
+        return NO_MATCH if final else NEED_MORE
+class PercentLiteral(Recognizer):
+    """Ruby's %q(...), %w[...], %{...}, %|...| and friends
+
+    A bracket delimiter closes at its match, counting nested pairs; any
+    other punctuation closes at its next occurrence. Backslashes escape.
+    Bracket matches come from one pass over the text per bracket kind.
+    """
+    def __init__(self, binary: bool = False):
+        super().__init__(binary=binary)
+        self.prefix = '%'
+        self.opener = self._regex('%[qQwWiIrsx]?([!-/:-@\\[-^`{-~])')
+        self.pairs = {self._text(opener): self._text(closer) for opener, closer in _PAIRS.items()}
+        self.bodies: Dict[Any, Pattern] = {}
+    def match(self, code, start: int, final: bool, memo: Dict[Any, Any]) -> int:
+        found = self.opener.match(code, start)
+        if not found:
+            return NO_MATCH
+        delimiter = found.group(1)
+        closer = self.pairs.get(delimiter)
+        if closer is None:
+            return self._match_same(code, found.end(), delimiter, final, memo)
+        matches = memo.get((self, delimiter))
+        if matches is None:
+            matches = memo[(self, delimiter)] = self._match_brackets(code, delimiter, closer)
+        end = matches.get(found.start(1))
+        if end is not None:
+            return end + 1
+        return NO_MATCH if final else NEED_MORE
+    def _match_same(self, code, start: int, delimiter, final: bool, memo: Dict[Any, Any]) -> int:
+        if delimiter == self._text('\\'):
+            return self._find(code, delimiter, start, (self, delimiter), memo, final)
+        body = self.bodies.get(delimiter)
+        if body is None:
+            quote = re.escape(self._source(delimiter))
+            body = self.bodies.setdefault(delimiter, self._regex(f'[^{quote}\\\\]*(?:\\\\.[^{quote}\\\\]*)*{quote}', re.DOTALL))
+        absent = memo.get((self, delimiter))
+        if absent is None or start < absent:
+            found = body.match(code, start)
+            if found:
+                return found.end()
+            memo[(self, delimiter)] = start
+        return NO_MATCH if final else NEED_MORE
+    def _match_brackets(self, code, opener, closer) -> Dict[int, int]:
+        """Position of every unescaped opener -> position of its matching closer, for the whole text"""
+        tokens = self._regex(f'\\\\.|{re.escape(self._source(opener))}|{re.escape(self._source(closer))}', re.DOTALL)
+        matches = {}
+        stack = []
+        for token in checked(tokens.finditer(code)):
+            text = token.group()
+            if text == opener:
+                stack.append(token.start())
+            elif text == closer and stack:
+                matches[stack.pop()] = token.start()
+        return matches
+    def _source(self, text) -> str:
+        return text.decode('ascii') if self.binary else text
\ No newline at end of file
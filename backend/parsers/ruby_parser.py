@@ -1,12 +1,13 @@
 from .base_parser import BaseParser
+from .recognizers import PercentLiteral, Quoted, Recognizer
 from typing import List, Tuple
 
 class RubyParser(BaseParser):
-    def get_string_patterns(self) -> List[str]:
+    def get_string_patterns(self) -> List[Recognizer]:
         return [
-            r'"(?:[^"\\]|\\.)*"',
-            r"'(?:[^'\\]|\\.)*'",
-            r'%[qQwWiIrsx]?[^\w\s].*?[^\w\s]',
+            Quoted('"'),
+            Quoted("'"),
+            PercentLiteral(),
         ]
     
     def get_comment_patterns(self) -> List[str]:
@@ -1,14 +1,15 @@
 from .base_parser import BaseParser
+from .recognizers import Quoted, RawString, Recognizer
 from typing import List, Tuple
 
 class RustParser(BaseParser):
-    def get_string_patterns(self) -> List[str]:
+    def get_string_patterns(self) -> List[Recognizer]:
         return [
-            r'"(?:[^"\\]|\\.)*"',
-            r"'(?:[^'\\]|\\.)*'",
-            r'r#*".*?"#*',
-            r'b"(?:[^"\\]|\\.)*"',
-            r"b'(?:[^'\\]|\\.)*'",
+            Quoted('"'),
+            Quoted("'"),
+            RawString(),
+            Quoted('"', 'b'),
+            Quoted("'", 'b'),
         ]
     
     def get_comment_patterns(self) -> List[str]:
@@ -0,0 +1,338 @@
+import re
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple, Union
+from ..budget import CHECK_INTERVAL, check
+from .recognizers import NEED_MORE, Recognizer
+from .whitespace import TextWriter
+STRING = 'string'
+LINE_COMMENT = 'line_comment'
+BLOCK_COMMENT = 'block_comment'
+OPEN_COMMENT = 'open_comment'
+PENDING = 'pending'
+LITERAL = 'literal'
+OPENER_LOOKAHEAD = 16
+MAX_PENDING = 1 << 20
+_CLOSERS = '\n\"\"\"\'\'\'`\"' + '#' * OPENER_LOOKAHEAD + ')]}>|/!;'
+_REGEX_META = '.^$*+?{}[]()|\\'
+def literal_prefix(pattern: str) -> str:
+    """Literal text every match of pattern starts with (case as written)"""
+    prefix = []
+    i = 0
+    while i < len(pattern):
+        if pattern[i] == '\\' and i + 1 < len(pattern) and not pattern[i + 1].isalnum():
+            char, step = pattern[i + 1], 2
+        elif pattern[i] in _REGEX_META:
+            break
+        else:
+            char, step = pattern[i], 1
+        if pattern[i + step:i + step + 1] in ('*', '?', '{'):
+            break
+        prefix.append(char)
+        i += step
+    return ''.join(prefix)
+class Scanner:
+    """Single-pass tokenizer built from a parser's string and comment tables.
+
+    Every pattern is dispatched on its leading character, so the input is
+    walked once: candidate positions are found with one character-class
+    search and only the rules for that character are tried there.
+
+    With binary=True the same rules are compiled as bytes patterns and the
+    scanner works on UTF-8 bytes, mmaps or memoryviews. Every delimiter is
+    ASCII and UTF-8 never reuses ASCII bytes inside multi-byte characters,
+    so token boundaries are the same as on the decoded text.
+
+    token_pattern optionally lexes the same rules with one regex for
+    tokens(), matched at every rule's leading character: a group named
+    after the kind (STRING or LINE_COMMENT) when a token starts there, no
+    group when an opener fails to close. That saves trying each rule in
+    turn until the first such failure, after which the rules take over,
+    with their memo keeping repeated failures linear.
+    """
+    def __init__(self, string_patterns: List[Union[str, Recognizer]], comment_patterns: List[str], multiline_comment_patterns: List[Tuple[str, str]], token_pattern: Optional[str] = None, binary: bool = False):
+        self.patterns = (string_patterns, comment_patterns, multiline_comment_patterns, token_pattern)
+        self.binary = binary
+        self.token_pattern = self._compile(token_pattern, re.DOTALL | re.MULTILINE) if token_pattern else None
+        self.closers = _CLOSERS.encode('ascii') if binary else _CLOSERS
+        self.rules: Dict[Any, List[Tuple[str, Pattern, Optional[Pattern], Any]]] = {}
+        for start, end in multiline_comment_patterns:
+            self._add_rule(BLOCK_COMMENT, self._compile(start), start, self._compile(end))
+        for pattern in comment_patterns:
+            self._add_rule(LINE_COMMENT, self._compile(pattern, re.MULTILINE), pattern)
+        for pattern in string_patterns:
+            if isinstance(pattern, Recognizer):
+                self._add_rule(LITERAL, pattern.compile(binary), pattern.prefix)
+            else:
+                self._add_rule(STRING, self._compile(pattern, re.DOTALL), pattern)
+        if not self.rules:
+            self.trigger = None
+        elif binary:
+            self.trigger = re.compile(b'[' + b''.join(re.escape(bytes([char])) for char in self.rules) + b']')
+        else:
+            self.trigger = re.compile('[' + ''.join(re.escape(char) for char in self.rules) + ']')
+        self._binary = None
+    def _compile(self, pattern: str, flags: int = 0) -> Pattern:
+        return re.compile(pattern.encode('ascii') if self.binary else pattern, flags)
+    def _add_rule(self, kind: str, compiled: Any, pattern: str, end: Optional[Pattern] = None):
+        prefix = pattern if kind == LITERAL else literal_prefix(pattern)
+        if not prefix:
+            raise ValueError(f'pattern must start with a literal character: {pattern!r}')
+        if self.binary:
+            prefix = prefix.encode('ascii')
+        self.rules.setdefault(prefix[0], []).append((kind, compiled, end, prefix))
+    def bytes_scanner(self) -> 'Scanner':
+        """The binary twin of this scanner, compiled on first use"""
+        if self.binary:
+            return self
+        binary = self._binary
+        if binary is None:
+            binary = self._binary = Scanner(*self.patterns, binary=True)
+        return binary
+    def _next_token(self, code: str, pos: int, final: bool = True, memo: Optional[Dict[Any, Any]] = None) -> Optional[Tuple[str, int, int, Optional[Pattern]]]:
+        """Next (kind, start, end, end_pattern) at or after pos, or None when there is none.
+
+        With final=False more text may follow code, so a token that could still
+        change once it arrives is reported as PENDING at its start instead. An
+        unclosed block comment comes back as OPEN_COMMENT ending after its opener.
+        memo is the recognizers' scratch space; pass the same dict for every
+        call over the same code to keep the scan linear. The budget is checked
+        every CHECK_INTERVAL candidates, as openers that start no token (a
+        '/' or '*' used as an operator) can run on for the whole input.
+        """
+        if memo is None:
+            memo = {}
+        if self.trigger is None:
+            return None
+        search = self.trigger.search
+        candidate = search(code, pos)
+        examined = 0
+        while candidate:
+            examined += 1
+            if not examined % CHECK_INTERVAL:
+                check()
+            start = candidate.start()
+            string_end = -1
+            undecided = False
+            for kind, compiled, end_pattern, prefix in self.rules[code[start]]:
+                if kind == LITERAL:
+                    end = compiled.match(code, start, final, memo)
+                    if end == NEED_MORE:
+                        undecided = True
+                    elif end > string_end:
+                        string_end = end
+                    continue
+                match = compiled.match(code, start)
+                if not match:
+                    if kind == STRING and not final and not undecided:
+                        if len(prefix) > 1 and len(code) - start >= len(prefix):
+                            undecided = code.startswith(prefix, start)
+                        else:
+                            undecided = bool(compiled.match(code[start:start + OPENER_LOOKAHEAD] + self.closers))
+                    continue
+                if kind == BLOCK_COMMENT:
+                    end_match = end_pattern.search(code, match.end())
+                    if not end_match:
+                        return OPEN_COMMENT, start, match.end(), end_pattern
+                    return BLOCK_COMMENT, start, end_match.end(), None
+                if kind == LINE_COMMENT:
+                    if not final and match.end() == len(code):
+                        return PENDING, start, start, None
+                    return LINE_COMMENT, start, match.end(), None
+                string_end = max(string_end, match.end())
+            if not final and (undecided or string_end == len(code) or len(code) - start < OPENER_LOOKAHEAD):
+                return PENDING, start, start, None
+            if string_end > start:
+                return STRING, start, string_end, None
+            candidate = search(code, start + 1)
+        return None
+    def _kept_end(self, code, last: int, start: int, kind: str) -> int:
+        """End of the text kept before a comment at start: a line comment also takes the spaces and tabs before it"""
+        if kind == LINE_COMMENT:
+            spaces = b' \t' if self.binary else ' \t'
+            while start > last and code[start - 1] in spaces:
+                start -= 1
+        return start
+    def tokens(self, code: str) -> Iterator[Tuple[str, int, int]]:
+        """Yield (kind, start, end) for every string literal and comment in code"""
+        pos = 0
+        count = 0
+        if self.token_pattern is not None:
+            search = self.trigger.search
+            match = self.token_pattern.match
+            while True:
+                count += 1
+                if not count % CHECK_INTERVAL:
+                    check()
+                candidate = search(code, pos)
+                if candidate is None:
+                    return
+                token = match(code, candidate.start())
+                if token is None or token.lastgroup is None:
+                    pos = candidate.start()
+                    break
+                pos = token.end()
+                yield token.lastgroup, token.start(), pos
+        memo = {}
+        while True:
+            count += 1
+            if not count % CHECK_INTERVAL:
+                check()
+            token = self._next_token(code, pos, True, memo)
+            if token is None:
+                return
+            kind, start, pos, _ = token
+            if kind == OPEN_COMMENT:
+                yield OPEN_COMMENT, start, len(code)
+                return
+            yield kind, start, pos
+    def segments(self, code) -> Tuple[List[Tuple[int, int, int]], int]:
+        """Comment removal as (start, end, newlines) triples: keep code[start:end], then that many line breaks"""
+        segments = []
+        removed = 0
+        last = 0
+        newline = b'\n' if self.binary else '\n'
+        for kind, start, end in self.tokens(code):
+            if kind == STRING:
+                continue
+            newlines = code[start:end].count(newline) if kind == BLOCK_COMMENT else 0
+            segments.append((last, self._kept_end(code, last, start, kind), newlines))
+            last = end
+            removed += 1
+        segments.append((last, len(code), 0))
+        return segments, removed
+    def scan(self, code: str, max_blank_lines: Optional[int] = None) -> Tuple[str, int]:
+        """Remove comments in one pass, keeping line breaks of block comments
+
+        With max_blank_lines set, whitespace is normalized as the output is
+        written (see TextWriter) rather than in a pass of its own.
+        """
+        out = TextWriter(max_blank_lines, self.binary)
+        newline = out.newline
+        removed = 0
+        last = 0
+        for kind, start, end in self.tokens(code):
+            if kind == STRING:
+                continue
+            out.write(code[last:self._kept_end(code, last, start, kind)])
+            if kind == BLOCK_COMMENT:
+                out.newlines(code.count(newline, start, end))
+            last = end
+            removed += 1
+        out.write(code[last:])
+        return out.text(), removed
+    def scan_piece(self, text: str, cut: int, final: bool, max_blank_lines: Optional[int] = None) -> Tuple[str, int, bool]:
+        """scan() of text[:cut], one piece of a larger input, as (cleaned, removed, settled)
+
+        The piece is scanned as if it started outside every comment and
+        string. text runs at least OPENER_LOOKAHEAD characters past cut unless
+        final, and settled is False when a token starting before cut runs past
+        it or cannot be decided yet, in which case cleaned is incomplete.
+        """
+        out = TextWriter(max_blank_lines)
+        removed = 0
+        pos = last = 0
+        count = 0
+        memo = {}
+        while True:
+            count += 1
+            if not count % CHECK_INTERVAL:
+                check()
+            token = self._next_token(text, pos, final, memo)
+            if token is None or token[1] >= cut:
+                break
+            kind, start, end, _ = token
+            if kind == PENDING or end > cut or (kind == OPEN_COMMENT and not final):
+                return out.take(), removed, False
+            if kind == STRING:
+                pos = end
+                continue
+            out.write(text[last:self._kept_end(text, last, start, kind)])
+            if kind == OPEN_COMMENT:
+                end = cut
+            elif kind == BLOCK_COMMENT:
+                out.newlines(text.count('\n', start, end))
+            removed += 1
+            last = pos = end
+        out.write(text[last:cut])
+        return out.text(), removed, True
+    def stream(self, chunks: Iterable[str], stats: Dict[str, int], max_blank_lines: Optional[int] = None) -> Iterator[str]:
+        """Incremental scan(): yield cleaned text as chunks arrive.
+
+        Only text whose tokenization is settled is emitted; an undecided tail
+        is carried into the next chunk, as are the spaces and tabs ending the
+        text, which a line comment in the next chunk would take. Inside a
+        block comment only its line break count and a short tail are kept, so
+        memory stays bounded by the chunk size plus the longest string literal
+        (capped at MAX_PENDING).
+        """
+        stats.setdefault('comments_removed', 0)
+        out = TextWriter(max_blank_lines)
+        buffer = ''
+        block_end = None
+        newlines = 0
+        for chunk, final in chain(((chunk, False) for chunk in chunks), (('', True),)):
+            check()
+            buffer += chunk
+            while True:
+                if block_end is not None:
+                    match = block_end.search(buffer)
+                    if match is None:
+                        if final:
+                            stats['comments_removed'] += 1
+                            buffer = ''
+                        else:
+                            keep = max(len(buffer) - OPENER_LOOKAHEAD, 0)
+                            newlines += buffer.count('\n', 0, keep)
+                            buffer = buffer[keep:]
+                        break
+                    newlines += buffer.count('\n', 0, match.end())
+                    out.newlines(newlines)
+                    stats['comments_removed'] += 1
+                    buffer = buffer[match.end():]
+                    block_end = None
+                    newlines = 0
+                pos = last = 0
+                carry = len(buffer)
+                memo = {}
+                while True:
+                    token = self._next_token(buffer, pos, final, memo)
+                    if token is not None and token[0] == PENDING and len(buffer) - token[1] > MAX_PENDING:
+                        forced = self._next_token(buffer, token[1], True)
+                        if forced is None or forced[1] != token[1]:
+                            pos = token[1] + 1
+                            continue
+                        token = forced
+                    if token is None:
+                        if not final:
+                            carry = self._kept_end(buffer, last, len(buffer), LINE_COMMENT)
+                        break
+                    kind, start, end, end_pattern = token
+                    if kind == STRING:
+                        pos = end
+                        continue
+                    if kind == PENDING:
+                        carry = self._kept_end(buffer, last, start, LINE_COMMENT)
+                        break
+                    out.write(buffer[last:self._kept_end(buffer, last, start, kind)])
+                    if kind == OPEN_COMMENT:
+                        if final:
+                            stats['comments_removed'] += 1
+                            last = carry = len(buffer)
+                        else:
+                            block_end = end_pattern
+                            last = carry = end
+                        break
+                    if kind == BLOCK_COMMENT:
+                        out.newlines(buffer.count('\n', start, end))
+                    stats['comments_removed'] += 1
+                    last = pos = end
+                out.write(buffer[last:carry])
+                text = out.take()
+                if text:
+                    yield text
+                buffer = buffer[carry:]
+                if block_end is None or not buffer:
+                    break
+        text = out.text()
+        if text:
+            yield text
@@ -0,0 +1,17 @@
+from typing import Iterable
+class TokenFinder:
+    """Next position of any of a few short tokens, using str.find and caching each token's next hit"""
+    def __init__(self, code: str, tokens: Iterable[str]):
+        self.code = code
+        self.end = len(code)
+        self.hits = {token: self._find(token, 0) for token in tokens}
+    def _find(self, token: str, pos: int) -> int:
+        hit = self.code.find(token, pos)
+        return self.end if hit == -1 else hit
+    def next(self, pos: int) -> int:
+        """Smallest index >= pos where one of the tokens starts, or len(code) when there is none"""
+        hits = self.hits
+        for token, hit in hits.items():
+            if hit < pos:
+                hits[token] = self._find(token, pos)
+        return min(hits.values())
\ No newline at end of file
@@ -1,11 +1,12 @@
 from .base_parser import BaseParser
+from .recognizers import Delimited, Quoted, Recognizer
 from typing import List, Tuple
 
 class SwiftParser(BaseParser):
-    def get_string_patterns(self) -> List[str]:
+    def get_string_patterns(self) -> List[Recognizer]:
         return [
-            r'"(?:[^"\\]|\\.)*"',
-            r'""".*?"""',
+            Quoted('"'),
+            Delimited('"""', '"""'),
         ]
     
     def get_comment_patterns(self) -> List[str]:
@@ -0,0 +1,160 @@
+import re
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+MAX_BLANK_LINES = 2
+WRITE_BATCH = 64 * 1024
+_LEADING = {False: re.compile('\n*'), True: re.compile(b'\n*')}
+_PATTERNS: Dict[Tuple[int, bool], Tuple[Pattern, Pattern]] = {}
+def _patterns(max_blank_lines: int, binary: bool) -> Tuple[Pattern, Pattern]:
+    """(dirty, runs): a line break after whitespace or starting one blank line too many, and a run of too many
+
+    Both start with a literal line break, which lets the regex engine skip
+    from one line break to the next instead of trying every position.
+    """
+    patterns = _PATTERNS.get((max_blank_lines, binary))
+    if patterns is None:
+        dirty = f'\\n(?:(?<=[^\\S\\n]\\n)|\\n{{{max_blank_lines + 1}}})'
+        runs = '\n' * (max_blank_lines + 2) + '\n*'
+        if binary:
+            dirty, runs = dirty.encode('ascii'), runs.encode('ascii')
+        patterns = _PATTERNS.setdefault((max_blank_lines, binary), (re.compile(dirty), re.compile(runs)))
+    return patterns
+class TextWriter:
+    """Output assembled from kept slices, normalized as it is written
+
+    With max_blank_lines set, every line loses its trailing whitespace and
+    runs of more than max_blank_lines blank lines are cut down, giving what
+    '\\n'.join() of the rstrip()ped lines of the whole output, blank runs
+    capped, would, without splitting it again. Slices may start and end
+    anywhere, in a line or in a run of blank lines: whitespace at the end of
+    the current line is held back until something follows it on that line,
+    and each line break is only written once the line after it is known to
+    be kept. Slices are normalized in batches of about WRITE_BATCH
+    characters, while the batch is still in cache; the whole lines of a
+    batch go through as one piece when a single regex search finds nothing
+    to change, and are only trimmed line by line when it does. With
+    max_blank_lines None the slices are kept as written. binary=True takes
+    bytes instead of str, stripping only ASCII whitespace as bytes.rstrip()
+    does.
+    """
+    def __init__(self, max_blank_lines: Optional[int] = None, binary: bool = False):
+        self.limit = max_blank_lines
+        self.newline = b'\n' if binary else '\n'
+        self.empty = self.newline[:0]
+        self.out: List = []
+        self.pending: List = []
+        self.size = 0
+        self.space = self.empty
+        self.content = False
+        self.blanks = 0
+        self.first = True
+        if max_blank_lines is not None:
+            self.dirty, self.runs = _patterns(max_blank_lines, binary)
+            self.leading = _LEADING[binary]
+            self.run = self.newline * (max_blank_lines + 1)
+    def write(self, text):
+        """Append text, which may hold any number of line breaks"""
+        if not text:
+            return
+        if self.limit is None:
+            self.out.append(text)
+            return
+        self.pending.append(text)
+        self.size += len(text)
+        if self.size >= WRITE_BATCH:
+            self._flush()
+    def newlines(self, count: int):
+        """Append count line breaks"""
+        self.write(self.newline * count)
+    def take(self):
+        """Everything written so far that is final, leaving the current line open"""
+        if self.pending:
+            self._flush()
+        text = self.empty.join(self.out)
+        self.out.clear()
+        return text
+    def text(self):
+        """End the output and return what take() has not"""
+        if self.limit is not None:
+            if self.pending:
+                self._flush()
+            self._end_line()
+        return self.take()
+    def _flush(self):
+        text = self.empty.join(self.pending)
+        self.pending.clear()
+        self.size = 0
+        first = text.find(self.newline)
+        if first == -1:
+            self._inline(text)
+            return
+        if first:
+            self._inline(text[:first])
+        self._end_line()
+        last = text.rfind(self.newline)
+        if last > first:
+            self._lines(text, first + 1, last + 1)
+        if last + 1 < len(text):
+            self._inline(text[last + 1:])
+    def _inline(self, text):
+        stripped = text.rstrip()
+        if not stripped:
+            self.space += text
+            return
+        if not self.content:
+            self.content = True
+            self._separator()
+        if self.space:
+            self.out.append(self.space)
+        self.out.append(stripped)
+        self.space = text[len(stripped):]
+    def _separator(self):
+        if self.first:
+            self.first = False
+        else:
+            self.out.append(self.newline)
+    def _end_line(self):
+        if self.content:
+            self.content = False
+            self.blanks = 0
+        else:
+            self._blank(1)
+        self.space = self.empty
+    def _blank(self, count: int):
+        """count blank lines, each already ended"""
+        keep = min(count, self.limit - self.blanks)
+        self.blanks += count
+        if keep > 0:
+            if self.first:
+                self.first = False
+                keep -= 1
+            if keep:
+                self.out.append(self.newline * keep)
+    def _lines(self, text, start: int, end: int):
+        """text[start:end]: whole lines, each ended by a line break, following one"""
+        newline = self.newline
+        dirty = self.dirty.search(text, start, end) is not None
+        if dirty:
+            text = newline.join([line.rstrip() for line in text[start:end].split(newline)])
+            start, end = 0, len(text)
+        lead = self.leading.match(text, start, end).end()
+        self._blank(lead - start)
+        if lead == end:
+            return
+        stop = end - 1
+        while text[stop - 1:stop] == newline:
+            stop -= 1
+        lines = text[lead:stop]
+        self._separator()
+        self.out.append(self.runs.sub(self.run, lines) if dirty else lines)
+        self.blanks = 0
+        self._blank(end - 1 - stop)
+def join_lines(lines: Iterable[str], max_blank_lines: Optional[int] = None) -> str:
+    """'\\n'.join(lines), normalized as TextWriter(max_blank_lines) does; lines may hold line breaks themselves"""
+    if max_blank_lines is None:
+        return '\n'.join(lines)
+    writer = TextWriter(max_blank_lines)
+    for i, line in enumerate(lines):
+        if i:
+            writer.newlines(1)
+        writer.write(line)
+    return writer.text()
\ No newline at end of file
@@ -0,0 +1,267 @@
+import os
+import threading
+import time
+from concurrent.futures import BrokenExecutor, Executor, Future, TimeoutError
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from .batch import _worker_state, process_item
+from .budget import cpu_budget
+from .metrics import METRICS
+INLINE_LIMIT = 32 * 1024
+WARM_HOLD = 0.005
+class Overloaded(Exception):
+    """Every offload slot is taken; the caller should answer 503"""
+def _warm(max_blank_lines: Optional[int], drop_docstrings: bool):
+    """Worker initializer: import and build every parser, and the detector, before the first job arrives"""
+    comment_processor, language_detector = _worker_state(max_blank_lines, drop_docstrings)
+    for language in comment_processor.parsers:
+        comment_processor.remove_comments('x\n', language)
+    language_detector.detect('x\n')
+def _ping(hold: float = 0.0) -> int:
+    if hold:
+        time.sleep(hold)
+    return os.getpid()
+def _remove_comments(code: str, language: str, budget: Optional[float], max_blank_lines: Optional[int], drop_docstrings: bool) -> Dict[str, Any]:
+    """CommentProcessor.remove_comments() within budget seconds of CPU time; runs inside a worker process"""
+    comment_processor, _ = _worker_state(max_blank_lines, drop_docstrings)
+    with cpu_budget(budget):
+        return comment_processor.remove_comments(code, language)
+def _call(metrics: bool, profile: bool, function: Callable, *args) -> Tuple[Any, Optional[Exception], Optional[Dict], Optional[Dict]]:
+    """function(*args) in a worker: (result, error, the metrics it recorded, its cProfile stats when profile is set)
+
+    The worker's registry is emptied first, so what comes back is this
+    call's share alone, for the parent to merge into its own.
+    """
+    METRICS.enabled = metrics
+    METRICS.collect()
+    profiler = result = error = stats = None
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        result = function(*args)
+    except Exception as e:
+        error = e
+    finally:
+        if profiler is not None:
+            profiler.disable()
+    if profiler is not None:
+        profiler.create_stats()
+        stats = profiler.stats
+    return result, error, METRICS.collect() if metrics else None, stats
+class WorkerPool:
+    """Long-lived process pool that large payloads and batches are handed to
+
+    The pool starts on the first job, or up front with start(), which waits
+    until every worker has imported and built all parsers; after that a job
+    costs one round trip over the pool's pipes. At most max_pending jobs
+    (a whole batch counts as one) may be queued or running at once, beyond
+    which remove_comments() and process() raise Overloaded, so small
+    requests never wait behind a backlog of large ones. Metrics a worker
+    records are merged into this process's registry, and a job for a
+    sampled slow-request profile is profiled in the worker and handed back.
+
+    multiprocessing is only imported when the first pool is created, so an
+    app that never offloads does not pay for it at import. A worker that
+    dies breaks the pool; the job it held fails and the next one starts a
+    fresh pool. A pool inherited across fork() is left to the parent and
+    started anew. Where no pool can be created at all (a runtime
+    without POSIX semaphores, say) the error is kept in health() and jobs
+    run inline, as they do after shutdown(). max_workers=0 disables the
+    pool and None means one worker per CPU.
+    """
+    def __init__(self, max_workers: Optional[int] = None, inline_limit: int = INLINE_LIMIT, max_pending: Optional[int] = None, budget: Optional[float] = None, max_blank_lines: Optional[int] = None, drop_docstrings: bool = False):
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        self.inline_limit = inline_limit
+        self.max_pending = max_pending or self.max_workers * 4
+        self.budget = budget
+        self.max_blank_lines = max_blank_lines
+        self.drop_docstrings = drop_docstrings
+        self.pending = 0
+        self.busy = 0
+        self.offloaded = 0
+        self.rejected = 0
+        self.restarts = 0
+        self.closed = False
+        self.error: Optional[str] = None
+        self.executor = None
+        self.pid = None
+        self.lock = threading.Lock()
+    def start(self, timeout: float = 30.0) -> 'WorkerPool':
+        """Launch every worker and wait, up to timeout seconds, until each has answered a ping
+
+        A worker only takes jobs once its initializer is done, and each ping
+        holds it for WARM_HOLD seconds, so pings reach the slower workers too.
+        """
+        executor = self._pool()
+        if executor is None:
+            return self
+        deadline = time.monotonic() + timeout
+        pids = set()
+        try:
+            while len(pids) < self.max_workers:
+                for future in [executor.submit(_ping, WARM_HOLD) for _ in range(self.max_workers)]:
+                    pids.add(future.result(max(deadline - time.monotonic(), 0)))
+        except TimeoutError:
+            pass
+        except (BrokenExecutor, OSError):
+            self._discard(executor)
+        return self
+    def _pool(self) -> Optional[Executor]:
+        """The executor, created on first use; None when the pool is disabled, shut down or cannot be created here"""
+        with self.lock:
+            if not self.max_workers or self.closed or self.error is not None:
+                return None
+            if self.executor is None or self.pid != os.getpid():
+                try:
+                    from concurrent.futures import ProcessPoolExecutor
+                    self.executor = ProcessPoolExecutor(self.max_workers, initializer=_warm, initargs=(self.max_blank_lines, self.drop_docstrings))
+                except (OSError, ImportError, NotImplementedError) as e:
+                    self.error = f'{type(e).__name__}: {e}'
+                    return None
+                self.pid = os.getpid()
+            return self.executor
+    def offloads(self, code: str) -> bool:
+        """Whether remove_comments() would send code to a worker"""
+        return len(code) > self.inline_limit and self.max_workers > 0 and not self.closed and self.error is None
+    @contextmanager
+    def _slot(self, workers: int = 1) -> Iterator[None]:
+        """Hold one of the max_pending slots for a job that keeps workers busy, or raise Overloaded"""
+        with self.lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise Overloaded(f'{self.pending} jobs already pending')
+            self.pending += 1
+            self.busy += workers
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.pending -= 1
+                self.busy -= workers
+    def _submit(self, function: Callable, *args, profile: bool = False) -> Tuple[Optional[Executor], Optional[Future]]:
+        """(executor, future) for function(*args) run through _call() on a worker, or (None, None) when it must run inline"""
+        executor = self._pool()
+        if executor is None:
+            return None, None
+        try:
+            future = executor.submit(_call, METRICS.enabled, profile, function, *args)
+        except (BrokenExecutor, OSError, RuntimeError):
+            self._discard(executor)
+            return None, None
+        with self.lock:
+            self.offloaded += 1
+        return executor, future
+    def _unwrap(self, shipped: Tuple[Any, Optional[Exception], Optional[Dict], Optional[Dict]], record: Any = None) -> Any:
+        """The result of a _call(), after merging its metrics and handing its profile to record"""
+        result, error, metrics, stats = shipped
+        if metrics:
+            METRICS.merge(metrics)
+        if stats is not None and record is not None:
+            record.add_stats(stats)
+        if error is not None:
+            raise error
+        return result
+    def remove_comments(self, code: str, language: str, record: Any = None) -> Dict[str, Any]:
+        """CommentProcessor.remove_comments() on a worker; BudgetExceeded raised there is raised here
+
+        record is the slow-request profiler's record for this request: when
+        it is sampled, the worker profiles the job and its stats join it.
+        """
+        args = (code, language, self.budget, self.max_blank_lines, self.drop_docstrings)
+        with self._slot():
+            executor, future = self._submit(_remove_comments, *args, profile=getattr(record, 'sampled', False))
+            if future is not None:
+                try:
+                    shipped = future.result()
+                except BrokenExecutor:
+                    self._discard(executor)
+                    raise
+        if future is None:
+            return _remove_comments(*args)
+        return self._unwrap(shipped, record)
+    def process(self, items: List[Any]) -> Dict[str, Any]:
+        """Clean batch items with process_item(), spread over the workers as one job that keeps them all busy"""
+        run = partial(process_item, budget=self.budget, max_blank_lines=self.max_blank_lines, drop_docstrings=self.drop_docstrings)
+        results = None
+        if self.max_workers > 1 and len(items) > 1:
+            with self._slot(self.max_workers):
+                executor = self._pool()
+                if executor is not None:
+                    chunksize = max(1, len(items) // (self.max_workers * 4))
+                    try:
+                        shipped = executor.map(partial(_call, METRICS.enabled, False, run), items, chunksize=chunksize)
+                        with self.lock:
+                            self.offloaded += 1
+                        results = [self._unwrap(result) for result in shipped]
+                    except BrokenExecutor:
+                        self._discard(executor)
+                        raise
+                    except (OSError, RuntimeError):
+                        self._discard(executor)
+        if results is None:
+            results = [run(item) for item in items]
+        return {
+            'results': results,
+            'stats': {
+                'files': len(results),
+                'failed': sum(1 for result in results if not result['success']),
+                'removed': sum(result['stats']['removed'] for result in results if result['success'])
+            }
+        }
+    def _discard(self, executor: Executor):
+        with self.lock:
+            if self.executor is executor:
+                self.executor = None
+                self.restarts += 1
+        executor.shutdown(wait=False)
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'workers': self.max_workers,
+            'inline_limit': self.inline_limit,
+            'max_pending': self.max_pending,
+            'pending': self.pending,
+            'busy': self.busy,
+            'offloaded': self.offloaded,
+            'rejected': self.rejected,
+            'restarts': self.restarts
+        }
+    def health(self, timeout: float = 1.0) -> Dict[str, Any]:
+        """Counters plus a round trip to one worker
+
+        status is ok, busy (every worker taken, a running batch taking them
+        all), idle (not started yet, as the pool starts on its first job),
+        down, stopped, disabled or unavailable (no pool can be created here;
+        error says why). A ping that times out behind jobs still in flight
+        means busy, not down: only a pool with nothing to do is down.
+        """
+        stats = self.stats()
+        if not self.max_workers:
+            return dict(stats, status='disabled')
+        if self.error is not None:
+            return dict(stats, status='unavailable', error=self.error)
+        if self.closed:
+            return dict(stats, status='stopped')
+        if self.busy >= self.max_workers:
+            return dict(stats, status='busy')
+        executor = self.executor
+        if executor is None or self.pid != os.getpid():
+            return dict(stats, status='idle')
+        started = time.perf_counter()
+        try:
+            executor.submit(_ping).result(timeout)
+        except TimeoutError:
+            return dict(stats, status='busy' if self.pending else 'down')
+        except (BrokenExecutor, RuntimeError):
+            self._discard(executor)
+            return dict(stats, status='down')
+        return dict(stats, status='ok', round_trip_ms=round((time.perf_counter() - started) * 1000, 3))
+    def shutdown(self):
+        """Stop taking jobs, let the running ones finish and stop the workers"""
+        with self.lock:
+            self.closed = True
+            executor, self.executor = self.executor, None
+        if executor is not None and self.pid == os.getpid():
+            executor.shutdown()
\ No newline at end of file
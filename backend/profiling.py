@@ -0,0 +1,99 @@
+import io
+import json
+import logging
+import random
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional
+class ProfileRecord(dict):
+    """What profile() yields: the fields to log, plus profiles taken elsewhere for the same request
+
+    sampled tells work handed to another process (see WorkerPool) whether
+    to profile itself there; the raw stats it ships back go to add_stats()
+    and are logged together with the request's own profile.
+    """
+    def __init__(self, sampled: bool = False):
+        super().__init__()
+        self.sampled = sampled
+        self.shipped: List[Dict] = []
+    def add_stats(self, stats: Dict):
+        """Add raw cProfile stats (Profile.stats after create_stats()) to this request's profile"""
+        self.shipped.append(stats)
+class _Shipped:
+    """Raw cProfile stats in the shape pstats.Stats loads a Profile from"""
+    def __init__(self, stats: Dict):
+        self.stats = stats
+    def create_stats(self):
+        pass
+class _Profiled:
+    """One request under observation: times it, maybe profiles it, and logs it if it was slow"""
+    def __init__(self, owner: 'SlowRequestProfiler', sampled: bool):
+        self.owner = owner
+        self.record = ProfileRecord(sampled)
+        self.profile = None
+        if sampled:
+            import cProfile
+            self.profile = cProfile.Profile()
+    def __enter__(self) -> Dict[str, Any]:
+        if self.profile is not None:
+            try:
+                self.profile.enable()
+            except ValueError:
+                self.profile = None
+        self.started = time.perf_counter()
+        return self.record
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        if self.profile is not None:
+            self.profile.disable()
+        if elapsed >= self.owner.threshold:
+            self.owner.report(elapsed, self.record, self.profile, exc)
+class SlowRequestProfiler:
+    """Opt-in profiling of slow requests into a rotating log
+
+    A sample_rate fraction of requests runs under cProfile; any request
+    slower than threshold seconds is logged with its size, language and
+    comment count, plus the profile's top functions when it was sampled,
+    including those of work a worker process profiled for it.
+    The code itself is only logged with include_code. Without a path every
+    profile() is a no-op, and cProfile, pstats and logging.handlers are only
+    imported once a log is configured or a request is sampled.
+    """
+    def __init__(self, path: Optional[str], threshold: float = 1.0, sample_rate: float = 0.01, include_code: bool = False,
+                 max_bytes: int = 10 * 1024 * 1024, backups: int = 3, top: int = 30):
+        self.path = path
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.include_code = include_code
+        self.top = top
+        self.logger = None
+        if path:
+            self.logger = logging.getLogger(f'{__name__}.{path}')
+            self.logger.propagate = False
+            self.logger.setLevel(logging.INFO)
+            if not self.logger.handlers:
+                from logging.handlers import RotatingFileHandler
+                handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                self.logger.addHandler(handler)
+    @property
+    def enabled(self) -> bool:
+        return self.logger is not None
+    def profile(self):
+        """Context manager yielding a dict for the caller to fill with language, size, removed and code"""
+        if self.logger is None:
+            return nullcontext(ProfileRecord())
+        return _Profiled(self, random.random() < self.sample_rate)
+    def report(self, elapsed: float, record: Dict[str, Any], profile: Any, error: Optional[BaseException] = None):
+        entry = {key: value for key, value in record.items() if key != 'code' or self.include_code}
+        sources = ([profile] if profile is not None else []) + [_Shipped(stats) for stats in getattr(record, 'shipped', ())]
+        entry.update(time=time.strftime('%Y-%m-%dT%H:%M:%S%z'), seconds=round(elapsed, 6), profiled=bool(sources))
+        if error is not None:
+            entry['error'] = repr(error)
+        lines = [json.dumps(entry, sort_keys=True)]
+        if sources:
+            import pstats
+            summary = io.StringIO()
+            pstats.Stats(*sources, stream=summary).strip_dirs().sort_stats('cumulative').print_stats(self.top)
+            lines.append(summary.getvalue().strip('\n'))
+        self.logger.info('\n'.join(lines) + '\n')
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""Small-request latency on the ASGI app under a mixed load of small and large payloads.
+
+Run from the repository root: python benchmarks/asgi_latency.py
+
+Requests are driven straight through asgi.app without a server, once with
+large payloads offloaded to the process pool and once with everything inline
+(what a single synchronous worker does).
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+import asgi
+from backend.dispatch import Dispatcher
+from corpus import generate
+SMALL = generate('javascript', 'comments', 2 * 1024)
+LARGE = generate('javascript', 'comments', 1024 * 1024)
+async def call(body: bytes, due: float):
+    """(status, seconds from the scheduled arrival time due) for one POST /api/process"""
+    sent = []
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+    async def send(message):
+        sent.append(message)
+    await asgi.app({'type': 'http', 'method': 'POST', 'path': '/api/process', 'headers': []}, receive, send)
+    return sent[0]['status'], time.perf_counter() - due
+async def load(duration: float, small_every: float, large_every: float):
+    """Fire unique small and large requests on a fixed schedule; (small latencies, status counts)
+
+    Latency counts from when a request was due, so time spent waiting for a
+    blocked event loop to even accept it is included.
+    """
+    tasks = []
+    kinds = []
+    started = time.perf_counter()
+    due = {'small': started, 'large': started}
+    every = {'small': small_every, 'large': large_every}
+    serial = 0
+    while time.perf_counter() - started < duration:
+        now = time.perf_counter()
+        for kind in due:
+            while due[kind] <= now:
+                serial += 1
+                code = (SMALL if kind == 'small' else LARGE) + f'\n// request {serial}'
+                body = json.dumps({'code': code, 'language': 'javascript'}).encode()
+                tasks.append(asyncio.ensure_future(call(body, due[kind])))
+                kinds.append(kind)
+                due[kind] += every[kind]
+        await asyncio.sleep(0.001)
+    results = await asyncio.gather(*tasks)
+    small = sorted(seconds for kind, (status, seconds) in zip(kinds, results) if kind == 'small' and status == 200)
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    return small, statuses
+def percentile(values, fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000 if values else float('nan')
+def main():
+    print(f"{'mode':10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}  statuses")
+    for mode, inline_limit in (('inline', 1 << 62), ('offload', asgi.dispatcher.inline_limit)):
+        asgi.dispatcher = Dispatcher(inline_limit=inline_limit)
+        asgi.result_cache.clear()
+        small, statuses = asyncio.run(load(3.0, 0.005, 0.1))
+        asgi.dispatcher.shutdown()
+        print(f'{mode:10} {percentile(small, 0.5):8.1f} {percentile(small, 0.99):8.1f} {percentile(small, 1.0):8.1f}  {statuses}')
+if __name__ == '__main__':
+    main()
\ No newline at end of file
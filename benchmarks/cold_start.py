@@ -0,0 +1,80 @@
+"""Cold start: time from importing an entry point to its first response, in fresh interpreters.
+
+Run from the repository root: python benchmarks/cold_start.py [--runs N]
+
+Each run starts a new Python process, so nothing is cached in memory; the
+bytecode cache on disk is warmed first, as it is on a deployed function.
+"import" covers the entry module and its dependencies, "first" the first
+request against it (parser construction and pattern compilation included)
+and "total" the whole process, interpreter startup included.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+BODY = {'code': 'def f():\n    # note\n    return 1  # done\n', 'language': 'python'}
+PROBES = {
+    'api/process.py': '''
+import api.process as entry
+from flask import request
+with entry.app.test_request_context('/api/process', method='POST', json=BODY):
+    response = entry.handler(request)
+''',
+    'main.py': '''
+import main as entry
+response = entry.app.test_client().post('/api/process', json=BODY)
+''',
+    'asgi.py': '''
+import asyncio
+import asgi as entry
+async def call():
+    async def receive():
+        return {'type': 'http.request', 'body': json.dumps(BODY).encode(), 'more_body': False}
+    async def send(message):
+        pass
+    await entry.app({'type': 'http', 'method': 'POST', 'path': '/api/process', 'headers': []}, receive, send)
+asyncio.run(call())
+''',
+    'CommentProcessor': '''
+from backend.comment_processor import CommentProcessor
+entry = CommentProcessor()
+response = entry.remove_comments(BODY['code'], BODY['language'])
+'''
+}
+TEMPLATE = '''
+import json, sys, time
+started = time.perf_counter()
+BODY = {body!r}
+sys.path.insert(0, {root!r})
+{imports}
+imported = time.perf_counter()
+{first}
+print(json.dumps([imported - started, time.perf_counter() - imported]))
+'''
+def probe(name: str) -> str:
+    """The probe script for name, timing its import lines apart from the first request"""
+    lines = PROBES[name].strip('\n').split('\n')
+    split = max(i for i, line in enumerate(lines) if line.startswith(('import ', 'from '))) + 1
+    return TEMPLATE.format(body=BODY, root=ROOT, imports='\n'.join(lines[:split]), first='\n'.join(lines[split:]))
+def run(script: str):
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    total = time.perf_counter() - started
+    return json.loads(output.strip().split('\n')[-1]) + [total]
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+    subprocess.run([sys.executable, '-m', 'compileall', '-q', ROOT], check=True)
+    print(f"{'entry point':18} {'import ms':>10} {'first ms':>9} {'total ms':>9}")
+    for name in PROBES:
+        script = probe(name)
+        samples = [run(script) for _ in range(args.runs)]
+        imported, first, total = (statistics.median(column) * 1000 for column in zip(*samples))
+        print(f'{name:18} {imported:10.1f} {first:9.1f} {total:9.1f}')
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,52 @@
+"""Wire size, time and server memory of /api/process with compressed and uncompressed bodies.
+
+Run from the repository root: python benchmarks/compression.py [--sizes KB ...]
+
+Each payload is posted through main.py's Flask test client in every coding: as
+plain JSON, gzip-compressed and, when the zstandard package is installed,
+zstd-compressed, asking for a response in the same coding. The columns give
+bytes sent and received, time spent in the request, and the peak Python
+heap while handling it, as tracemalloc sees it. Times are taken with
+tracemalloc running, so they only compare with each other.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+os.environ.setdefault('UNCOMMENT_POOL_WORKERS', '0')
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+import main as server
+from backend.compress import compress, encodings
+from corpus import generate
+def post(client, body: bytes, encoding: str):
+    """(response, ms, peak heap MB) for one POST /api/process"""
+    headers = {'Content-Type': 'application/json', 'Accept-Encoding': encoding}
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = client.post('/api/process', data=body, headers=headers)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return response, elapsed * 1000, peak / 1024 / 1024
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[256, 1024, 4096], help='payload sizes in KB')
+    args = parser.parse_args()
+    client = server.app.test_client()
+    print(f"{'payload':>9} {'coding':>9} {'sent KB':>9} {'received KB':>12} {'ms':>8} {'peak MB':>8}")
+    for size in args.sizes:
+        for encoding in ['identity'] + encodings():
+            code = generate('javascript', 'comments', size * 1024) + f'\n// {encoding}'
+            body = json.dumps({'code': code, 'language': 'javascript'}).encode('utf-8')
+            if encoding != 'identity':
+                body = compress(body, encoding)
+            response, ms, peak = post(client, body, encoding)
+            if response.status_code != 200:
+                sys.exit(f'{encoding} request failed with {response.status_code}: {response.get_data()[:200]!r}')
+            print(f'{size:>7}KB {encoding:>9} {len(body) / 1024:9.0f} {len(response.get_data()) / 1024:12.0f} {ms:8.1f} {peak:8.1f}')
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""Deterministic synthetic source corpora for every supported language.
+
+Each shape stresses a different path through the parsers:
+
+- comments: most lines carry a line or block comment
+- strings: string literals full of comment markers
+- long_line: one huge line with no newline to split on
+- short_lines: a very large number of tiny lines
+- nesting: comment openers inside strings, nested openers and deep brackets
+- sparse: typical production code, where few lines hold a comment or string
+"""
+import random
+from typing import Callable, Dict, Optional, Tuple
+SYNTAX: Dict[str, Dict[str, Optional[object]]] = {
+    'python': {'line': '#', 'block': ('"""', '"""'), 'quote': '"', 'stmt': 'value = compute(a, b)'},
+    'javascript': {'line': '//', 'block': ('/*', '*/'), 'quote': '"', 'stmt': 'const value = compute(a, b);'},
+    'typescript': {'line': '//', 'block': ('/*', '*/'), 'quote': '"', 'stmt': 'let value: number = compute(a, b);'},
+    'java': {'line': '//', 'block': ('/*', '*/'), 'quote': '"', 'stmt': 'int value = compute(a, b);'},
+    'cpp': {'line': '//', 'block': ('/*', '*/'), 'quote': '"', 'stmt': 'auto value = compute(a, b);'},
+    'c': {'line': '//', 'block': ('/*', '*/'), 'quote': '"', 'stmt': 'int value = compute(a, b);'},
+    'csharp': {'line': '//', 'block': ('/*', '*/'), 'quote': '"', 'stmt': 'var value = Compute(a, b);'},
+    'go': {'line': '//', 'block': ('/*', '*/'), 'quote': '"', 'stmt': 'value := compute(a, b)'},
+    'rust': {'line': '//', 'block': ('/*', '*/'), 'quote': '"', 'stmt': 'let value = compute(a, b);'},
+    'php': {'line': '//', 'block': ('/*', '*/'), 'quote': '"', 'stmt': '$value = compute($a, $b);'},
+    'ruby': {'line': '#', 'block': ('=begin\n', '\n=end'), 'quote': '"', 'stmt': 'value = compute(a, b)'},
+    'swift': {'line': '//', 'block': ('/*', '*/'), 'quote': '"', 'stmt': 'let value = compute(a, b)'},
+    'kotlin': {'line': '//', 'block': ('/*', '*/'), 'quote': '"', 'stmt': 'val value = compute(a, b)'},
+    'scala': {'line': '//', 'block': ('/*', '*/'), 'quote': '"', 'stmt': 'val value = compute(a, b)'},
+    'html': {'line': None, 'block': ('<!--', '-->'), 'quote': '"', 'stmt': '<p class="note">value</p>'},
+    'css': {'line': None, 'block': ('/*', '*/'), 'quote': '"', 'stmt': '.note { color: red; }'},
+    'sql': {'line': '--', 'block': ('/*', '*/'), 'quote': "'", 'stmt': 'SELECT a, b FROM t WHERE a = 1;'}
+}
+def _comment(syntax, text: str) -> str:
+    if syntax['line']:
+        return f"{syntax['line']} {text}"
+    start, end = syntax['block']
+    return f'{start} {text} {end}'
+def _block(syntax, text: str) -> str:
+    start, end = syntax['block']
+    return f'{start} {text} {end}'
+def _string(syntax, text: str) -> str:
+    quote = syntax['quote']
+    return f'{quote}{text}{quote}'
+def comments(language: str, size: int, rng: random.Random) -> str:
+    syntax = SYNTAX[language]
+    lines = []
+    total = 0
+    while total < size:
+        roll = rng.random()
+        if roll < 0.4:
+            line = _comment(syntax, 'explain the next step in some detail ' * rng.randint(1, 3))
+        elif roll < 0.6:
+            line = _block(syntax, 'block comment\nspanning\nseveral lines')
+        else:
+            line = f"{syntax['stmt']} {_comment(syntax, 'trailing note')}"
+        lines.append(line)
+        total += len(line) + 1
+    return '\n'.join(lines)
+def strings(language: str, size: int, rng: random.Random) -> str:
+    syntax = SYNTAX[language]
+    start, end = syntax['block']
+    marker = syntax['line'] or start
+    lines = []
+    total = 0
+    while total < size:
+        parts = [_string(syntax, rng.choice([f'{marker} not a comment', f'{start} nor this {end}', 'http://example.com/x', 'plain']))
+                 for _ in range(rng.randint(2, 6))]
+        line = f"{syntax['stmt']} {' + '.join(parts)}"
+        lines.append(line)
+        total += len(line) + 1
+    return '\n'.join(lines)
+def long_line(language: str, size: int, rng: random.Random) -> str:
+    syntax = SYNTAX[language]
+    start, end = syntax['block']
+    piece = f"{syntax['stmt']} {_string(syntax, 'text')} "
+    if '\n' not in start + end:
+        piece += f'{start} inline {end} '
+    return piece * (size // len(piece) + 1)
+def short_lines(language: str, size: int, rng: random.Random) -> str:
+    syntax = SYNTAX[language]
+    lines = []
+    total = 0
+    while total < size:
+        line = rng.choice(['x', 'y', '', '}', _comment(syntax, 'c')])
+        lines.append(line)
+        total += len(line) + 1
+    return '\n'.join(lines)
+def nesting(language: str, size: int, rng: random.Random) -> str:
+    syntax = SYNTAX[language]
+    start, end = syntax['block']
+    marker = syntax['line'] or start
+    unit = (
+        f"{syntax['stmt']} {_string(syntax, start)} {_string(syntax, marker)}\n"
+        f"{start} {start} {start} nested {end}\n"
+        f"{'(' * 64}{_string(syntax, end)}{')' * 64}\n"
+    )
+    return unit * (size // len(unit) + 1)
+def sparse(language: str, size: int, rng: random.Random) -> str:
+    syntax = SYNTAX[language]
+    lines = []
+    total = 0
+    while total < size:
+        roll = rng.random()
+        indent = '    ' * rng.randint(0, 3)
+        if roll < 0.02:
+            line = indent + _comment(syntax, 'why this is done')
+        elif roll < 0.07:
+            line = f"{indent}{syntax['stmt']} {_string(syntax, 'label')}"
+        else:
+            line = indent + syntax['stmt']
+        lines.append(line)
+        total += len(line) + 1
+    return '\n'.join(lines)
+SHAPES: Dict[str, Callable[[str, int, random.Random], str]] = {
+    'comments': comments,
+    'strings': strings,
+    'long_line': long_line,
+    'short_lines': short_lines,
+    'nesting': nesting,
+    'sparse': sparse
+}
+def generate(language: str, shape: str, size: int, seed: int = 0) -> str:
+    """Roughly size characters of language source in the given shape; identical for identical arguments"""
+    return SHAPES[shape](language, size, random.Random(f'{language}/{shape}/{seed}'))
+def cases(size: int) -> Dict[Tuple[str, str], str]:
+    return {(language, shape): generate(language, shape, size) for language in SYNTAX for shape in SHAPES}
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""Equivalence fuzzer: the stream, bytes, parallel-piece and token-pattern paths must match remove_comments() exactly.
+
+Run from the repository root: python benchmarks/equivalence.py [--seed S] [--cases N]
+
+Every language is fed the corpus shapes plus N random texts built from
+fragments that open and close strings, comments, heredocs and raw strings,
+under three settings: defaults, max_blank_lines=1 and drop_docstrings.
+Each text must come out identical, removed count included, from
+remove_comments_stream() over random chunk sizes, from
+remove_comments_bytes(), and from remove_comments_parallel() cut at random
+line breaks into pieces as small as one line, so that comments and strings
+run over the cuts. PythonParser's combined token pattern is also checked
+against the per-rule scanner on random Python fragments, for str and bytes.
+The seed is fixed, so a failure reproduces; any mismatch exits with status 1.
+"""
+import argparse
+import os
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+import backend.comment_processor as comment_processor
+from backend.comment_processor import CommentProcessor
+from backend.parsers.python_parser import PythonParser
+from backend.parsers.scanner import Scanner
+from corpus import SHAPES, generate
+FRAGMENTS = [
+    'a', 'b', ' ', '\t', '\n', '\n', '\n', '\n\n\n', '\r', 'é', '"', "'", '`', '/', '*', '#', '-', '\\', '=',
+    '//', '/*', '*/', '--', '<!--', '-->', '"""', "'''", '=begin\n', '\n=end', 'r#"', '"#', 'R"x(', ')x"',
+    '@"', '<<<EOT\n', '\nEOT;', '%q(', ')', 'x = 1;', 'def f():\n    ', 'class A:\n    '
+]
+PYTHON_FRAGMENTS = ['a', ' ', '\t', '\n', '"', "'", '#', '\\', 'r', '"""', "'''", '""', "''", 'x = 1']
+def random_text(rng: random.Random, fragments, size: int) -> str:
+    return ''.join(rng.choice(fragments) for _ in range(rng.randint(0, size)))
+@contextmanager
+def random_cuts(rng: random.Random):
+    """remove_comments_parallel() cutting at 1 to 12 random line breaks, whatever the input size"""
+    def split_pieces(code, count, search=0):
+        breaks = [i for i, char in enumerate(code) if char == '\n']
+        bounds = []
+        start = 0
+        for cut in sorted(rng.sample(breaks, min(len(breaks), rng.randint(1, 12)))):
+            bounds.append((start, cut))
+            start = cut + 1
+        bounds.append((start, len(code)))
+        return bounds
+    saved = comment_processor.split_pieces, comment_processor.PARALLEL_MIN_PIECE
+    comment_processor.split_pieces, comment_processor.PARALLEL_MIN_PIECE = split_pieces, 1
+    try:
+        yield
+    finally:
+        comment_processor.split_pieces, comment_processor.PARALLEL_MIN_PIECE = saved
+def chunked(rng: random.Random, code: str):
+    chunks = []
+    i = 0
+    while i < len(code):
+        size = rng.choice([1, 2, 3, 5, 8, 40, 200, 4096])
+        chunks.append(code[i:i + size])
+        i += size
+    return chunks
+def mismatches(rng: random.Random, processor: CommentProcessor, executor, language: str, code: str):
+    """Names of the paths whose output differs from remove_comments() on code"""
+    want = processor.remove_comments(code, language)
+    stats = {}
+    streamed = ''.join(processor.remove_comments_stream(chunked(rng, code), language, stats))
+    data = processor.remove_comments_bytes(code.encode('utf-8'), language)
+    with random_cuts(rng):
+        parallel = processor.remove_comments_parallel(code, language, executor, pieces=50)
+    got = {
+        'stream': {'code': streamed, 'stats': stats},
+        'bytes': {'code': b''.join(bytes(buffer) for buffer in data['buffers']).decode('utf-8'), 'stats': data['stats']},
+        'parallel': parallel
+    }
+    return [name for name, result in got.items() if result != want]
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--cases', type=int, default=300, help='random texts per language and setting')
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    settings = {'defaults': CommentProcessor(), 'max_blank_lines=1': CommentProcessor(1), 'drop_docstrings': CommentProcessor(None, True)}
+    failures = 0
+    total = 0
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for setting, processor in settings.items():
+            for language in processor.get_supported_languages():
+                texts = [generate(language, shape, 4000, seed) for shape in SHAPES for seed in range(2)]
+                texts += [random_text(rng, FRAGMENTS, 80) for _ in range(args.cases)]
+                for code in texts:
+                    total += 1
+                    wrong = mismatches(rng, processor, executor, language, code)
+                    if wrong:
+                        failures += 1
+                        if failures <= 5:
+                            print(f'{setting} {language} {"/".join(wrong)}: {code!r}')
+            print(f'{setting}: {total} texts checked, {failures} mismatched so far')
+    python = PythonParser()
+    combined = python._scanner()
+    rules = Scanner(python.get_string_patterns(), python.get_comment_patterns(), python.get_multiline_comment_patterns())
+    scanners = [(combined, rules), (combined.bytes_scanner(), rules.bytes_scanner())]
+    token_failures = 0
+    for _ in range(args.cases * 50):
+        code = random_text(rng, PYTHON_FRAGMENTS, 60)
+        for (fast, slow), text in zip(scanners, (code, code.encode('utf-8'))):
+            if list(fast.tokens(text)) != list(slow.tokens(text)):
+                token_failures += 1
+                if token_failures <= 5:
+                    print(f'python token pattern: {text!r}')
+    print(f'python token pattern: {args.cases * 100} texts checked, {token_failures} mismatched')
+    failures += token_failures
+    print(f'{failures} mismatch(es)')
+    sys.exit(1 if failures else 0)
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""Cost of the metrics instrumentation on small remove_comments() calls, disabled and enabled.
+
+Run from the repository root: python benchmarks/metrics_overhead.py
+"""
+import os
+import sys
+import timeit
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from backend.comment_processor import CommentProcessor
+from backend.metrics import METRICS
+from corpus import generate
+CALLS = 2000
+def main():
+    processor = CommentProcessor()
+    print(f"{'language':12} {'disabled us':>12} {'enabled us':>11} {'overhead':>9}")
+    for language in ('python', 'javascript', 'go', 'sql'):
+        code = generate(language, 'comments', 512)
+        timings = {}
+        for enabled in (False, True):
+            METRICS.enabled = enabled
+            timings[enabled] = min(timeit.repeat(lambda: processor.remove_comments(code, language), number=CALLS, repeat=5)) / CALLS
+        METRICS.enabled = False
+        print(f'{language:12} {timings[False] * 1e6:12.1f} {timings[True] * 1e6:11.1f} {timings[True] / timings[False] - 1:8.1%}')
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""One huge file cleaned serially and with remove_comments_parallel() on thread and process pools.
+
+Run from the repository root: python benchmarks/parallel_file.py [--size MB] [--workers N]
+
+Every parallel result is checked against the serial one. Threads only speed
+things up on a free-threaded build; process pools pay for pickling each
+piece and its result, so they pay off on large inputs and several cores.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from backend.comment_processor import CommentProcessor
+from corpus import generate
+LANGUAGES = ('python', 'javascript', 'go', 'rust', 'sql')
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--size', type=int, default=16, help='input size in MB')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    processor = CommentProcessor()
+    pools = {'threads': ThreadPoolExecutor(args.workers), 'processes': ProcessPoolExecutor(args.workers)}
+    for pool in pools.values():
+        list(pool.map(abs, range(args.workers)))
+    print(f'{args.size} MB per language, {args.workers} workers')
+    print(f"{'language':12} {'serial s':>9} {'threads s':>10} {'processes s':>12}  identical")
+    for language in LANGUAGES:
+        code = generate(language, 'sparse', args.size * 1024 * 1024)
+        expected, serial = timed(lambda: processor.remove_comments(code, language))
+        timings = []
+        identical = True
+        for pool in pools.values():
+            result, seconds = timed(lambda: processor.remove_comments_parallel(code, language, pool, pieces=args.workers * 2))
+            timings.append(seconds)
+            identical = identical and result == expected
+        print(f'{language:12} {serial:9.2f} {timings[0]:10.2f} {timings[1]:12.2f}  {identical}')
+    for pool in pools.values():
+        pool.shutdown()
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,43 @@
+"""Microbenchmark: per-request cost of compiling patterns vs reusing cached ones.
+
+Run from the repository root: python benchmarks/pattern_cache.py
+"""
+import os
+import re
+import sys
+import timeit
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from backend.comment_processor import CommentProcessor
+from backend.language_detector import LanguageDetector
+from backend.parsers.scanner import Scanner
+SAMPLES = {
+    'go': 'package main\n// c\nfunc main() { s := "a // b" /* x */ }\n',
+    'rust': 'fn main() {\n    let s = "a"; // c\n    /* d */\n}\n',
+    'php': '<?php\n# a\n$x = "b"; // c\n/* d */\n',
+    'ruby': 'def foo\n  x = "a" # b\nend\n',
+    'sql': "SELECT 'a' -- b\nFROM t /* c */;\n",
+    'css': 'body { color: red; } /* c */\n',
+    'html': '<html>\n<!-- c -->\n<body class="a"></body>\n',
+}
+def uncached_request(processor, detector, code, language):
+    """What every request paid before: raw pattern strings, cold re cache"""
+    re.purge()
+    parser = processor.parsers[language]
+    scanner = Scanner(parser.get_string_patterns(), parser.get_comment_patterns(), parser.get_multiline_comment_patterns())
+    scanner.scan(code)
+    for patterns in detector.patterns.values():
+        for pattern in patterns:
+            re.findall(pattern, code, re.MULTILINE | re.DOTALL | re.IGNORECASE)
+def cached_request(processor, detector, code, language):
+    processor.remove_comments(code, language)
+    detector.detect(code)
+def main(number: int = 200):
+    processor = CommentProcessor()
+    detector = LanguageDetector()
+    print(f'{"language":<10} {"uncached us":>12} {"cached us":>10} {"speedup":>8}')
+    for language, code in SAMPLES.items():
+        before = timeit.timeit(lambda: uncached_request(processor, detector, code, language), number=number)
+        after = timeit.timeit(lambda: cached_request(processor, detector, code, language), number=number)
+        print(f'{language:<10} {before / number * 1e6:>12.1f} {after / number * 1e6:>10.1f} {before / after:>7.1f}x')
+if __name__ == '__main__':
+    main()
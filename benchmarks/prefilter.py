@@ -0,0 +1,28 @@
+"""Line-based parsers with and without the bulk prefilter on low comment-density code.
+
+Run from the repository root: python benchmarks/prefilter.py
+"""
+import os
+import sys
+import timeit
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from backend.comment_processor import CommentProcessor
+from backend.parsers.base_parser import LineParser
+from corpus import generate
+SIZE = 1024 * 1024
+def per_line(parser: LineParser, code: str) -> str:
+    """What process() did before the prefilter: every line through the state machine"""
+    return '\n'.join(parser._clean_lines(code.split('\n'), {'comments_removed': 0}))
+def main():
+    processor = CommentProcessor()
+    print(f"{'language':12} {'per line ms':>12} {'prefilter ms':>13} {'speedup':>8}")
+    for language, parser in processor.parsers.items():
+        if not isinstance(parser, LineParser):
+            continue
+        code = generate(language, 'sparse', SIZE)
+        assert parser.process(code)['cleaned_code'] == per_line(parser, code)
+        before = min(timeit.repeat(lambda: per_line(parser, code), number=1, repeat=5))
+        after = min(timeit.repeat(lambda: parser.process(code), number=1, repeat=5))
+        print(f'{language:12} {before * 1000:12.1f} {after * 1000:13.1f} {before / after:7.1f}x')
+if __name__ == '__main__':
+    main()
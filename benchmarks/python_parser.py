@@ -0,0 +1,106 @@
+"""PythonParser against the per-line loop it replaced and a tokenize-based reference, on large stdlib modules.
+
+Run from the repository root: python benchmarks/python_parser.py [--modules N] [--repeat R]
+
+Each of the N largest modules of the running interpreter's standard library
+(repeated R times, to make large modules larger) is cleaned three ways: by
+PythonParser, by the per-line loop PythonParser used before it tracked
+strings across lines, and by tokenize, whose COMMENT tokens are the
+reference for what is a comment. The mismatch columns count output lines
+that differ from the reference: the per-line loop only looks at lines
+holding a '#', which makes it fast, but takes '#' inside triple-quoted
+strings for comments. speedup compares PythonParser with tokenize, the
+other accurate way. The last column times drop_docstrings and checks that
+its output still compiles. Any mismatch or failure exits with status 1.
+"""
+import argparse
+import io
+import os
+import sys
+import sysconfig
+import time
+import tokenize
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from backend.parsers.python_parser import PythonParser
+def previous_line(line: str) -> str:
+    """The per-line loop PythonParser used to run, kept here for comparison"""
+    if '#' not in line:
+        return line
+    in_string = False
+    string_char = None
+    escape_next = False
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if escape_next:
+            escape_next = False
+        elif char == '\\':
+            escape_next = True
+        elif not in_string and char in '"\'':
+            if line[i:i + 3] == char * 3:
+                end_pos = line.find(char * 3, i + 3)
+                if end_pos != -1:
+                    i = end_pos + 3
+                    continue
+                i += 2
+            in_string = True
+            string_char = char
+        elif in_string and char == string_char:
+            in_string = False
+            string_char = None
+        elif not in_string and char == '#':
+            return line[:i].rstrip()
+        i += 1
+    return line
+def previous(code: str) -> str:
+    return '\n'.join(previous_line(line) for line in code.split('\n'))
+def reference(code: str) -> str:
+    """code without its COMMENT tokens and the spaces and tabs before them"""
+    lines = code.split('\n')
+    for token in tokenize.generate_tokens(io.StringIO(code).readline):
+        if token.type == tokenize.COMMENT:
+            row, col = token.start
+            line = lines[row - 1]
+            lines[row - 1] = line[:col].rstrip(' \t') + line[col + len(token.string):]
+    return '\n'.join(lines)
+def timed(function, code: str):
+    best = float('inf')
+    for _ in range(3):
+        started = time.perf_counter()
+        result = function(code)
+        best = min(best, time.perf_counter() - started)
+    return result, best * 1000
+def mismatches(got: str, want: str) -> int:
+    return sum(1 for a, b in zip(got.split('\n'), want.split('\n')) if a != b) + abs(got.count('\n') - want.count('\n'))
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--modules', type=int, default=8, help='how many of the largest stdlib modules to use')
+    parser.add_argument('--repeat', type=int, default=1, help='times each module is repeated')
+    args = parser.parse_args()
+    stdlib = sysconfig.get_paths()['stdlib']
+    paths = sorted((os.path.join(stdlib, name) for name in os.listdir(stdlib) if name.endswith('.py')), key=os.path.getsize)
+    scanner = PythonParser()
+    dropping = PythonParser(drop_docstrings=True)
+    print(f"{'module':16} {'KB':>6} {'per-line ms':>12} {'scanner ms':>11} {'tokenize ms':>12} {'speedup':>8} {'mismatch old/new':>17} {'docstrings ms':>14}")
+    failures = 0
+    for path in reversed(paths[-args.modules:]):
+        with open(path, encoding='utf-8') as f:
+            code = f.read() * args.repeat
+        want, reference_ms = timed(reference, code)
+        old, old_ms = timed(previous, code)
+        new, new_ms = timed(lambda text: scanner.process(text)['cleaned_code'], code)
+        stripped, drop_ms = timed(lambda text: dropping.process(text)['cleaned_code'], code)
+        try:
+            compile(stripped, path, 'exec')
+            compiles = ''
+        except SyntaxError:
+            failures += 1
+            compiles = '  FAIL'
+        wrong = mismatches(new, want)
+        failures += wrong > 0
+        print(f'{os.path.basename(path):16} {len(code) / 1024:6.0f} {old_ms:12.2f} {new_ms:11.2f} {reference_ms:12.2f} '
+              f'{reference_ms / new_ms:7.1f}x {mismatches(old, want):8} / {wrong:<6} {drop_ms:14.2f}{compiles}')
+    print(f'{failures} module(s) mismatched the reference or stopped compiling')
+    sys.exit(1 if failures else 0)
+if __name__ == '__main__':
+    main()
\ No newline at end of file
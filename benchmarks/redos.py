@@ -0,0 +1,118 @@
+"""Adversarial inputs for every parser: worst-case time must grow linearly with input size.
+
+Run from the repository root: python benchmarks/redos.py [--size KB] [--ratio R] [--budget S]
+
+Each case repeats a fragment built to make a backtracking pattern rescan the
+rest of the input on every attempt: unterminated and escaped quotes, raw
+string and heredoc openers that never close, unbalanced brackets. Every
+language runs every case through remove_comments() and
+remove_comments_bytes() at size and at 4 x size. A linear parser takes about
+4x as long on the bigger input, a quadratic one 16x; any case growing by
+more than --ratio fails the run with exit status 1.
+
+String-free code full of operators and one very long line are among the
+cases: they start no token, so they stress the loops between tokens rather
+than the patterns. With --budget, every case is also run at --budget-size
+under cpu_budget(S) and must finish, or raise BudgetExceeded, within twice
+S of CPU time. A single literal spanning the input is matched by one regex
+call the budget cannot interrupt, about 70 ms per MB, so pick S above that
+for the size checked (the server's default of 2s is).
+"""
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from backend.budget import BudgetExceeded, cpu_budget
+from backend.comment_processor import CommentProcessor
+FRAGMENTS = {
+    'escaped quotes': lambda i: '"\\' + "'\\" + '`\\',
+    'open quotes': lambda i: 'x"',
+    'open single quotes': lambda i: "x'",
+    'open backticks': lambda i: 'x`',
+    'open triple quotes': lambda i: 'x"""',
+    'raw strings': lambda i: 'r#"x"',
+    'byte strings': lambda i: 'b"\\',
+    'heredocs': lambda i: f'<<<L{i}\n',
+    'percent literals': lambda i: '%q(%w[%{%<(',
+    'percent pipes': lambda i: '%|\\',
+    'block openers': lambda i: '/* <!-- =begin ',
+    'comment markers in strings': lambda i: '"//" \'#\' "--" "/*"\n',
+    'one long line': lambda i: 'a / b * c # "d" ',
+    'one long operator line': lambda i: 'a / b * c ',
+    'operators': lambda i: 'let number = other_number * 2 / b;\n',
+    'bare b identifiers': lambda i: 'b ',
+    'many lines': lambda i: 'x = "y" // z\n'
+}
+def build(fragment, size: int) -> str:
+    parts = []
+    length = 0
+    i = 0
+    while length < size:
+        part = fragment(i)
+        parts.append(part)
+        length += len(part)
+        i += 1
+    return ''.join(parts)[:size]
+def seconds(processor: CommentProcessor, code: str, language: str) -> float:
+    data = code.encode('utf-8')
+    best = float('inf')
+    for _ in range(3):
+        started = time.perf_counter()
+        processor.remove_comments(code, language)
+        processor.remove_comments_bytes(data, language)
+        best = min(best, time.perf_counter() - started)
+    return best
+def budget_seconds(processor: CommentProcessor, code: str, language: str, budget: float) -> float:
+    """CPU seconds remove_comments() and remove_comments_bytes() each take under cpu_budget(budget), the longer one"""
+    worst = 0.0
+    for run in (lambda: processor.remove_comments(code, language), lambda: processor.remove_comments_bytes(code.encode('utf-8'), language)):
+        started = time.thread_time()
+        try:
+            with cpu_budget(budget):
+                run()
+        except BudgetExceeded:
+            pass
+        worst = max(worst, time.thread_time() - started)
+    return worst
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--size', type=int, default=16, help='smaller input size in KB')
+    parser.add_argument('--ratio', type=float, default=8.0, help='largest growth allowed for 4x the input')
+    parser.add_argument('--budget', type=float, default=0.0, help='also check that a CPU budget of this many seconds holds')
+    parser.add_argument('--budget-size', type=int, default=10 * 1024, help='input size in KB for the budget check')
+    args = parser.parse_args()
+    processor = CommentProcessor()
+    size = args.size * 1024
+    failures = 0
+    worst = {}
+    print(f"{'language':12} {'worst case':28} {'ms':>8} {'4x ms':>8} {'growth':>7}")
+    for language in processor.get_supported_languages():
+        for name, fragment in FRAGMENTS.items():
+            small = seconds(processor, build(fragment, size), language)
+            large = seconds(processor, build(fragment, 4 * size), language)
+            growth = large / max(small, 1e-4)
+            if growth > args.ratio:
+                failures += 1
+                print(f'{language:12} {name:28} {small * 1000:8.2f} {large * 1000:8.2f} {growth:6.1f}x  FAIL')
+            if language not in worst or large > worst[language][2]:
+                worst[language] = (name, small, large, growth)
+        name, small, large, growth = worst[language]
+        print(f'{language:12} {name:28} {small * 1000:8.2f} {large * 1000:8.2f} {growth:6.1f}x')
+    print(f'{failures} case(s) grew faster than {args.ratio:g}x')
+    overruns = 0
+    if args.budget:
+        print(f"{'language':12} {'slowest under budget':28} {'cpu s':>8}")
+        for language in processor.get_supported_languages():
+            slowest = (0.0, '')
+            for name, fragment in FRAGMENTS.items():
+                spent = budget_seconds(processor, build(fragment, args.budget_size * 1024), language, args.budget)
+                if spent > 2 * args.budget:
+                    overruns += 1
+                    print(f'{language:12} {name:28} {spent:8.2f}  FAIL')
+                slowest = max(slowest, (spent, name))
+            print(f'{language:12} {slowest[1]:28} {slowest[0]:8.2f}')
+        print(f'{overruns} case(s) ran past twice the {args.budget:g}s budget')
+    sys.exit(1 if failures or overruns else 0)
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""Throughput and peak-memory benchmark for every parser and the language detector.
+
+Run from the repository root:
+
+    python benchmarks/suite.py                 # report
+    python benchmarks/suite.py --save          # store the result as the baseline
+    python benchmarks/suite.py --check         # exit 1 on a regression against the baseline
+
+Throughput is compared after scaling by a fixed calibration workload, so a
+baseline recorded on one machine stays meaningful on another.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from backend.comment_processor import CommentProcessor
+from backend.language_detector import LanguageDetector
+from corpus import SHAPES, SYNTAX, generate
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+def calibrate(repeat: int = 7) -> float:
+    """Seconds for a fixed mix of interpreter and regex work on this machine"""
+    text = 'value = compute(a, b)  # note\n' * 50000
+    pattern = re.compile(r'#.*$', re.MULTILINE)
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        total = 0
+        for line in text.split('\n'):
+            total += len(line.rstrip())
+        pattern.sub('', text)
+        best = min(best, time.perf_counter() - started)
+    return best
+def measure(run, data: str, repeat: int, budget: float = 1.0):
+    """(MB/s over the best of up to repeat runs within budget seconds, peak traced KB of one run)
+
+    Tracing slows allocation-heavy runs down by an order of magnitude, so cases
+    that already blow the budget untraced report no peak (None).
+    """
+    best = float('inf')
+    spent = 0.0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run(data)
+        elapsed = time.perf_counter() - started
+        best = min(best, elapsed)
+        spent += elapsed
+        if spent > budget:
+            break
+    if best > budget:
+        return len(data.encode('utf-8')) / best / 1e6, None
+    tracemalloc.start()
+    run(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(data.encode('utf-8')) / max(best, 1e-9) / 1e6, peak / 1024
+def run_suite(size: int, repeat: int, languages, shapes):
+    """Yield (case, (MB/s, peak KB)) for every parser and detector case"""
+    processor = CommentProcessor()
+    detector = LanguageDetector()
+    for language in languages:
+        for shape in shapes:
+            data = generate(language, shape, size)
+            yield f'{language}/{shape}', measure(lambda code: processor.remove_comments(code, language), data, repeat)
+            yield f'detect:{language}/{shape}', measure(detector.detect, data, repeat)
+def compare(results, baseline, scale: float, threshold: float):
+    """Cases slower or hungrier than the baseline by more than threshold"""
+    regressions = []
+    for case, (throughput, peak) in results.items():
+        if case not in baseline['results']:
+            continue
+        base_throughput, base_peak = baseline['results'][case]
+        expected = base_throughput * scale
+        if throughput < expected * (1 - threshold):
+            regressions.append(f'{case}: {throughput:.2f} MB/s vs {expected:.2f} MB/s expected')
+        if peak is not None and base_peak is not None and peak > base_peak * (1 + threshold) + 64:
+            regressions.append(f'{case}: peak {peak:.0f} KB vs {base_peak:.0f} KB baseline')
+    return regressions
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--size', type=int, default=64, help='corpus size per case in KB (default 64)')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per case; the best is kept (default 5)')
+    parser.add_argument('--languages', default=','.join(SYNTAX), help='comma-separated languages')
+    parser.add_argument('--shapes', default=','.join(SHAPES), help='comma-separated corpus shapes')
+    parser.add_argument('--baseline', default=BASELINE, help='baseline file (default benchmarks/baseline.json)')
+    parser.add_argument('--save', action='store_true', help='store this run as the baseline')
+    parser.add_argument('--check', action='store_true', help='fail when a case regresses past --threshold')
+    parser.add_argument('--threshold', type=float, default=0.5, help='allowed relative regression (default 0.5)')
+    args = parser.parse_args()
+    calibration = calibrate()
+    results = {}
+    print(f"{'case':36} {'MB/s':>9} {'peak KB':>9}")
+    for case, (throughput, peak) in run_suite(args.size * 1024, args.repeat, args.languages.split(','), args.shapes.split(',')):
+        results[case] = (throughput, peak)
+        print(f"{case:36} {throughput:9.2f} {'-' if peak is None else f'{peak:.0f}':>9}", flush=True)
+    if args.save:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'size': args.size, 'calibration': calibration, 'results': results}, f, indent=1, sort_keys=True)
+        print(f'baseline written to {args.baseline}')
+    if args.check:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline['size'] != args.size:
+            print(f"baseline was recorded with --size {baseline['size']}", file=sys.stderr)
+            return 2
+        regressions = compare(results, baseline, baseline['calibration'] / calibration, args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        print(f'{len(regressions)} regressions in {len(results)} cases')
+        return 1 if regressions else 0
+    return 0
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
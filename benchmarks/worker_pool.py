@@ -0,0 +1,54 @@
+"""Dispatch overhead of main.py's pre-warmed worker pool against cleaning inline and spawning a pool per request.
+
+Run from the repository root: python benchmarks/worker_pool.py [--workers N] [--repeat R]
+
+The ping row times an empty round trip to a warm worker: the fixed cost of
+handing any job over. Each size row cleans one unique JavaScript payload
+inline, on the warm pool and on a pool started for that request alone (what
+a per-request pool costs: spawning, importing and building the parser).
+overhead is the warm pool's time minus the inline time, which is what
+moving a payload to another core costs, pipes and pickling included.
+"""
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from backend.comment_processor import CommentProcessor
+from backend.pool import WorkerPool, _ping
+from corpus import generate
+SIZES = [64 * 1024, 1024 * 1024, 4 * 1024 * 1024]
+def best(function, repeat: int) -> float:
+    """Fastest of repeat calls to function(i), in ms"""
+    fastest = float('inf')
+    for i in range(repeat):
+        started = time.perf_counter()
+        function(i)
+        fastest = min(fastest, time.perf_counter() - started)
+    return fastest * 1000
+def cold(code: str) -> None:
+    pool = WorkerPool(1, inline_limit=0).start()
+    pool.remove_comments(code, 'javascript')
+    pool.shutdown()
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--workers', type=int, default=2, help='warm pool size')
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per row; the fastest counts')
+    args = parser.parse_args()
+    processor = CommentProcessor()
+    started = time.perf_counter()
+    pool = WorkerPool(args.workers, inline_limit=0).start()
+    print(f'started {args.workers} warm worker(s) in {(time.perf_counter() - started) * 1000:.1f} ms')
+    executor = pool._pool()
+    print(f"{'payload':>10} {'inline ms':>10} {'warm pool ms':>13} {'overhead ms':>12} {'per-request pool ms':>20}")
+    ping = best(lambda i: executor.submit(_ping).result(), args.repeat * 10)
+    print(f"{'ping':>10} {'':>10} {ping:13.3f} {ping:12.3f} {'':>20}")
+    for size in SIZES:
+        payloads = [generate('javascript', 'comments', size) + f'\n// {i}' for i in range(args.repeat)]
+        inline = best(lambda i: processor.remove_comments(payloads[i], 'javascript'), args.repeat)
+        warm = best(lambda i: pool.remove_comments(payloads[i], 'javascript'), args.repeat)
+        spawned = best(lambda i: cold(payloads[i]), min(args.repeat, 3))
+        print(f'{size // 1024:>8}KB {inline:10.2f} {warm:13.2f} {warm - inline:12.2f} {spawned:20.2f}')
+    pool.shutdown()
+if __name__ == '__main__':
+    main()
\ No newline at end of file
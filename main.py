@@ -1,20 +1,98 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Request, Response, render_template, request, jsonify, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
+import atexit
+import codecs
+import json
 import os
 import sys
+from itertools import chain
 
 
 sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
 
 from backend.comment_processor import CommentProcessor
 from backend.language_detector import LanguageDetector
+from backend.cache import ResultCache
+from backend.pool import INLINE_LIMIT, Overloaded, WorkerPool
+from backend.budget import BudgetExceeded, cpu_budget
+from backend.compress import COMPRESS_MIN, READ_SIZE, DecodedTooLarge, DecodeError, UnsupportedEncoding, compress, compressed, decoded, negotiate
+from backend.metrics import METRICS
+from backend.profiling import SlowRequestProfiler
+
+MAX_BODY_BYTES = int(os.environ.get('UNCOMMENT_MAX_BODY_BYTES', 10 * 1024 * 1024))
+MAX_STREAM_BYTES = int(os.environ.get('UNCOMMENT_MAX_STREAM_BYTES', 0)) or None
+CPU_BUDGET = float(os.environ.get('UNCOMMENT_CPU_BUDGET', 2.0)) or None
+METRICS.enabled = bool(int(os.environ.get('UNCOMMENT_METRICS', 0)))
+MAX_BLANK_LINES = int(os.environ['UNCOMMENT_MAX_BLANK_LINES']) if os.environ.get('UNCOMMENT_MAX_BLANK_LINES') else None
+DROP_DOCSTRINGS = bool(int(os.environ.get('UNCOMMENT_DROP_DOCSTRINGS', 0)))
+
+class LimitedRequest(Request):
+    """Request whose body limit depends on the endpoint: streaming uploads get their own"""
+    @property
+    def max_content_length(self):
+        return MAX_STREAM_BYTES if self.endpoint == 'process_stream' else MAX_BODY_BYTES
 
 app = Flask(__name__)
+app.request_class = LimitedRequest
 CORS(app)
 
 
-comment_processor = CommentProcessor()
+comment_processor = CommentProcessor(MAX_BLANK_LINES, DROP_DOCSTRINGS)
 language_detector = LanguageDetector()
+result_cache = ResultCache(
+    max_bytes=int(os.environ.get('UNCOMMENT_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    ttl=float(os.environ.get('UNCOMMENT_CACHE_TTL', 600))
+)
+slow_profiler = SlowRequestProfiler(
+    os.environ.get('UNCOMMENT_PROFILE_LOG'),
+    threshold=float(os.environ.get('UNCOMMENT_PROFILE_THRESHOLD', 1.0)),
+    sample_rate=float(os.environ.get('UNCOMMENT_PROFILE_SAMPLE_RATE', 0.01)),
+    include_code=bool(int(os.environ.get('UNCOMMENT_PROFILE_CODE', 0)))
+)
+POOL_WORKERS = os.environ.get('UNCOMMENT_POOL_WORKERS')
+worker_pool = WorkerPool(
+    int(POOL_WORKERS) if POOL_WORKERS else None,
+    inline_limit=int(os.environ.get('UNCOMMENT_INLINE_LIMIT', INLINE_LIMIT)),
+    max_pending=int(os.environ.get('UNCOMMENT_MAX_PENDING', 0)) or None,
+    budget=CPU_BUDGET,
+    max_blank_lines=MAX_BLANK_LINES,
+    drop_docstrings=DROP_DOCSTRINGS
+)
+if POOL_WORKERS:
+    worker_pool.start()
+atexit.register(worker_pool.shutdown)
+
+def remove_comments(code, language, record=None):
+    """Clean code here, or on the worker pool when it is large; record is the slow-request profiler's"""
+    if worker_pool.offloads(code):
+        return worker_pool.remove_comments(code, language, record)
+    return comment_processor.remove_comments(code, language)
+
+def read_json():
+    """The JSON request body, decoded as it is read when it was sent with a Content-Encoding"""
+    encoding = request.headers.get('Content-Encoding', '').strip().lower()
+    if encoding in ('', 'identity'):
+        return request.get_json()
+    return json.loads(b''.join(decoded(request.stream.read, encoding, MAX_BODY_BYTES)) or b'null')
+
+def encoded(response):
+    """response compressed as the client's Accept-Encoding allows, once it is big enough to gain from it"""
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate(request.headers.get('Accept-Encoding'))
+    if encoding and response.content_length >= COMPRESS_MIN:
+        response.set_data(compress(response.get_data(), encoding))
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+@app.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    return jsonify({'error': f'Request body exceeds {request.max_content_length} bytes'}), 413
+
+def encoding_error(e):
+    """The response for a body that cannot be decoded"""
+    status = 413 if isinstance(e, DecodedTooLarge) else 415 if isinstance(e, UnsupportedEncoding) else 400
+    return jsonify({'error': str(e)}), status
 
 @app.route('/')
 def index():
@@ -23,7 +101,7 @@ def index():
 @app.route('/api/process', methods=['POST'])
 def process_code():
     try:
-        data = request.get_json()
+        data = read_json()
         code = data.get('code', '')
         language = data.get('language', '')
         
@@ -31,26 +109,140 @@ def process_code():
             return jsonify({'error': 'No code provided'}), 400
         
 
-        if not language:
-            language = language_detector.detect(code)
-        
+        with slow_profiler.profile() as record:
+            record.update(size=len(code), code=code)
+            if not language:
+                language = result_cache.memoize(('detect', code), lambda: language_detector.detect(code), len)
+            record['language'] = language
 
-        result = comment_processor.remove_comments(code, language)
+            with cpu_budget(CPU_BUDGET):
+                result = result_cache.memoize(
+                    ('process', code, language.lower()),
+                    lambda: remove_comments(code, language, record),
+                    lambda result: len(result['code'])
+                )
+            record['removed'] = result['stats']['removed']
         
-        return jsonify({
+        return encoded(jsonify({
             'success': True,
             'processed_code': result['code'],
             'detected_language': language,
             'stats': result['stats']
+        }))
+    
+    except RequestEntityTooLarge as e:
+        return request_too_large(e)
+    except (DecodeError, DecodedTooLarge, UnsupportedEncoding) as e:
+        return encoding_error(e)
+    except BudgetExceeded as e:
+        return jsonify({'error': str(e)}), 422
+    except Overloaded:
+        return jsonify({'error': 'Server busy, retry shortly'}), 503, {'Retry-After': '1'}
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/process/batch', methods=['POST'])
+def process_batch():
+    try:
+        data = request.get_json()
+        items = data.get('files') if isinstance(data, dict) else data
+        
+        if not items or not isinstance(items, list):
+            return jsonify({'error': 'No files provided'}), 400
+        
+        result = worker_pool.process(items)
+        
+        return jsonify({
+            'success': True,
+            'results': result['results'],
+            'stats': result['stats']
         })
     
+    except RequestEntityTooLarge as e:
+        return request_too_large(e)
+    except Overloaded:
+        return jsonify({'error': 'Server busy, retry shortly'}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/process/stream', methods=['POST'])
+def process_stream():
+    language = request.args.get('language', '')
+    decoder = codecs.getincrementaldecoder('utf-8')('replace')
+    try:
+        body = decoded(request.stream.read, request.headers.get('Content-Encoding'), MAX_STREAM_BYTES)
+    except UnsupportedEncoding as e:
+        return encoding_error(e)
+    
+    def read_chunks():
+        for data in body:
+            text = decoder.decode(data)
+            if text:
+                yield text
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+    
+    def rest(chunks):
+        """The chunks after the head; a decode error there comes after the 200, so it aborts the response
+
+        The rest of the raw body is read first (MAX_STREAM_BYTES still bounds
+        it), so the server can close the connection at once and the client
+        sees the response cut off rather than waiting on it.
+        """
+        try:
+            yield from chunks
+        except (DecodeError, DecodedTooLarge) as e:
+            app.logger.warning('Aborted /api/process/stream response: %s', e)
+            while request.stream.read(READ_SIZE):
+                pass
+            raise
+    
+    chunks = read_chunks()
+    head = []
+    size = 0
+    try:
+        for chunk in chunks:
+            head.append(chunk)
+            size += len(chunk)
+            if language or size >= language_detector.sample_size:
+                break
+    except (DecodeError, DecodedTooLarge) as e:
+        return encoding_error(e)
+    if not language:
+        language = language_detector.detect(''.join(head))
+    
+    cleaned = comment_processor.remove_comments_stream(chain(head, rest(chunks)), language)
+    headers = {'X-Detected-Language': language, 'Vary': 'Accept-Encoding'}
+    encoding = negotiate(request.headers.get('Accept-Encoding'))
+    if encoding:
+        cleaned = compressed((text.encode('utf-8') for text in cleaned), encoding)
+        headers['Content-Encoding'] = encoding
+    return Response(
+        stream_with_context(cleaned),
+        mimetype='text/plain',
+        headers=headers
+    )
+
 @app.route('/api/languages')
 def get_supported_languages():
     return jsonify(comment_processor.get_supported_languages())
 
+@app.route('/api/cache')
+def get_cache_stats():
+    return jsonify(result_cache.stats())
+
+@app.route('/api/health')
+def get_health():
+    health = worker_pool.health()
+    return jsonify(health), 503 if health['status'] == 'down' else 200
+
+@app.route('/metrics')
+def get_metrics():
+    if not METRICS.enabled:
+        return jsonify({'error': 'Metrics are disabled; set UNCOMMENT_METRICS=1'}), 404
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/sitemap.xml')
 def sitemap():
     from flask import send_from_directory
@@ -1,3 +1,5 @@
+const COMPRESS_MIN_BYTES = 64 * 1024;
+
 class UnCommentApp {
     constructor() {
         this.initializeElements();
@@ -102,15 +104,17 @@ class UnCommentApp {
         this.processBtn.disabled = true;
 
         try {
+            const request = await this.encodeBody(JSON.stringify({
+                code: code,
+                language: this.languageSelect.value
+            }));
             const response = await fetch('/api/process', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
+                    ...request.headers
                 },
-                body: JSON.stringify({
-                    code: code,
-                    language: this.languageSelect.value
-                })
+                body: request.body
             });
 
             const result = await response.json();
@@ -130,6 +134,19 @@ class UnCommentApp {
         }
     }
 
+    async encodeBody(body) {
+        // Large bodies go gzip-compressed where the browser can do it; the
+        // response is compressed by the server and decoded by the browser.
+        if (body.length < COMPRESS_MIN_BYTES || typeof CompressionStream === 'undefined') {
+            return { body: body, headers: {} };
+        }
+        const stream = new Blob([body]).stream().pipeThrough(new CompressionStream('gzip'));
+        return {
+            body: await new Response(stream).blob(),
+            headers: { 'Content-Encoding': 'gzip' }
+        };
+    }
+
     displayResult(result) {
         this.outputCode.value = result.processed_code;
         